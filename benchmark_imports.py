@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Time how long each script takes to import, and to start from the command line, in fresh interpreters.
+# Run from the repository root: python benchmark_imports.py --repeat 5
+# Short batch jobs spend much of their time starting up, so this shows what a job pays before it does any work and which libraries it loaded.
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules a job imports: the scripts without drawing, the table and chart modules, and the libraries themselves for comparison.
+MODULES = [
+    'video_game_sales_i.video_game_sales_data_clean',
+    'video_game_sales_ii.video_game_sales_data_viz',
+    'video_game_sales_i.incremental',
+    'video_game_sales_i.parallel',
+    'video_game_sales_i.clean_report',
+    'video_game_sales_ii.viz_report',
+    'pandas',
+    'pyarrow.parquet',
+    'matplotlib.pyplot',
+    'seaborn',
+    'great_tables',
+]
+# Command lines timed from start to exit.  An empty interpreter is the baseline; --help imports the script and parses its options without running it.
+COMMANDS = [
+    ['-c', 'pass'],
+    ['portfolio.py', 'clean', '--help'],
+    ['portfolio.py', 'viz', '--help'],
+]
+# Libraries reported as loaded or not by each import.
+HEAVY_LIBRARIES = ['matplotlib', 'seaborn', 'great_tables']
+
+
+def import_time(module_name):
+    """Returns the seconds a fresh interpreter takes to import module_name, as measured by python -X importtime, and the heavy libraries it loaded."""
+    check = f"import json, sys; print(json.dumps([lib for lib in {HEAVY_LIBRARIES!r} if lib in sys.modules]))"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module_name}; {check}'], cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    # Each line is "import time: self | cumulative | name"; the line of the module itself comes last among its own imports.
+    cumulative = [int(us) for us, name in re.findall(r'import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)', result.stderr) if name == module_name]
+    return cumulative[-1] / 1e6, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def command_time(argv):
+    """Returns the seconds a command line takes from start to exit."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable] + argv, cwd=REPO_DIR, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the imports and startup of the scripts in fresh interpreters.')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each import and command; the median is reported')
+    parser.add_argument('--modules', nargs='+', default=MODULES)
+    args = parser.parse_args()
+
+    print(f"{'import':<50} {'median':>9} {'min':>9}  heavy libraries loaded")
+    for module_name in args.modules:
+        runs = [import_time(module_name) for _ in range(args.repeat)]
+        seconds = [s for s, _ in runs]
+        loaded = ', '.join(runs[-1][1]) or '-'
+        print(f"{module_name:<50} {statistics.median(seconds):8.3f}s {min(seconds):8.3f}s  {loaded}")
+
+    print(f"\n{'command':<50} {'median':>9} {'min':>9}")
+    for argv in COMMANDS:
+        seconds = [command_time(argv) for _ in range(args.repeat)]
+        print(f"{'python ' + ' '.join(argv):<50} {statistics.median(seconds):8.3f}s {min(seconds):8.3f}s")
+
+
+if __name__ == '__main__':
+    main()
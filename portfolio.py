@@ -0,0 +1,51 @@
+import argparse
+import importlib
+import os
+import runpy
+import sys
+
+# One command line for the scripts in this repository.  Run from the repository root:
+#   python portfolio.py clean [--render-dir DIR] [--workers N] [--no-report]
+#   python portfolio.py viz [--render-dir DIR] [--workers N] [--no-report]
+#   python portfolio.py serve [--port PORT | --socket PATH] [--cache-size N]
+#   python portfolio.py affordability
+# Only the module of the chosen command is imported, and the scripts import matplotlib, seaborn and great_tables only when they draw, so a scheduled job that cleans or aggregates without drawing starts quickly.
+# Everything after the command is passed to its script, so `python portfolio.py clean --help` lists the script's own options.
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Each command runs the main() of a module.
+COMMANDS = {
+    'clean': ('video_game_sales_i.video_game_sales_data_clean', 'clean vgsales.csv, write the cleaned dataset and the run report, and show or render the tables and charts'),
+    'viz': ('video_game_sales_ii.video_game_sales_data_viz', 'aggregate the cleaned dataset and show or render the charts and tables'),
+    'serve': ('video_game_sales_ii.query_service', 'serve the analyses of the cleaned dataset as JSON queries on localhost'),
+}
+# The affordability study is a plain script that reads its data files from its own folder.
+AFFORDABILITY_SCRIPT = os.path.join(REPO_DIR, 'teacher_salary', 'teacher_salary_house_value_by_school_district_matplotlib.py')
+
+
+def run_command(command, argv):
+    """Runs a command with the rest of the command line."""
+    if command == 'affordability':
+        os.chdir(os.path.dirname(AFFORDABILITY_SCRIPT))
+        sys.argv = [AFFORDABILITY_SCRIPT] + argv
+        runpy.run_path(AFFORDABILITY_SCRIPT, run_name='__main__')
+    else:
+        module_name, _ = COMMANDS[command]
+        # The script's usage and errors name the command it was run as.
+        sys.argv = [f'{os.path.basename(sys.argv[0])} {command}'] + argv
+        importlib.import_module(module_name).main(argv)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the data cleaning, visualization and affordability scripts of the portfolio.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command, (_, help_text) in COMMANDS.items():
+        # The script parses its own options, including --help.
+        subparsers.add_parser(command, help=help_text, add_help=False)
+    subparsers.add_parser('affordability', help='show the house values and teacher salaries of four school districts')
+    args, rest = parser.parse_known_args(argv)
+    run_command(args.command, rest)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import csv
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from video_game_sales_i.games_store import read_games, write_games_dataset
+from video_game_sales_i.synthetic_vgsales import generate_vgsales
+from video_game_sales_i.video_game_sales_data_clean import DATA_DIR, STAGES, run_stages
+from video_game_sales_ii.video_game_sales_data_viz import AGGREGATIONS, VIZ_COLUMNS, sales_cube
+
+# Time every stage of the cleaning pipeline and every aggregation of the visualization script on synthetic files of increasing size.
+# Run from the repository root: python -m video_game_sales_i.benchmark_stages --sizes 10000 1000000
+# Results are written one row per size and step, so two versions can be compared with diff.
+SIZES = [10_000, 1_000_000, 10_000_000]
+# Written to the current directory and ignored by git.
+RESULTS_FILE = 'benchmark_results.csv'
+# Generated files are kept here between runs; the same size and seed always give the same file.
+BENCHMARK_DATA_DIR = os.path.join(DATA_DIR, '.benchmark_data')
+
+
+def measure(run):
+    """Returns the result of run(), the seconds it took and the peak memory in bytes allocated while it ran.
+
+    run is called twice: once with tracemalloc on for the peak, and once with it off for the time, as tracing every allocation slows pandas and numpy down several times over.
+    """
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    start = time.perf_counter()
+    result = run()
+    seconds = time.perf_counter() - start
+    return result, seconds, peak
+
+
+def synthetic_file(size, seed=0):
+    """Returns the path of a generated .csv with size records, writing it on first use."""
+    path = os.path.join(BENCHMARK_DATA_DIR, f'vgsales_{size}_{seed}.csv')
+    if not os.path.exists(path):
+        os.makedirs(BENCHMARK_DATA_DIR, exist_ok=True)
+        generate_vgsales(size, seed=seed).to_csv(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def benchmark_size(size, params=None, seed=0):
+    """Returns one result row for every cleaning stage, the dataset write and read, and every visualization aggregation on a synthetic file of size records."""
+    params = dict(params or {})
+    params['load'] = {'filename': synthetic_file(size, seed), **params.get('load', {})}
+    rows = []
+
+    def record(script, step, seconds, peak):
+        rows.append({'script': script, 'size': size, 'step': step, 'seconds': round(seconds, 4), 'peak_mb': round(peak / 1024**2, 1)})
+
+    results = {}
+    for stage_name, _, _ in STAGES:
+        results, seconds, peak = measure(lambda: run_stages(results, params, first=stage_name, last=stage_name))
+        record('clean', stage_name, seconds, peak)
+
+    dataset_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(dataset_dir, 'games_final_dataset')
+        _, seconds, peak = measure(lambda: write_games_dataset(results['games_final'], path))
+        record('clean', 'write_dataset', seconds, peak)
+        games_final, seconds, peak = measure(lambda: read_games(path, columns=VIZ_COLUMNS))
+        record('viz', 'read_dataset', seconds, peak)
+    finally:
+        shutil.rmtree(dataset_dir, ignore_errors=True)
+
+    frames = {'games_final': games_final}
+    outputs, seconds, peak = measure(lambda: sales_cube(games_final))
+    frames.update(outputs)
+    record('viz', 'sales_cube', seconds, peak)
+    for agg_name, func, inputs in AGGREGATIONS:
+        # A new empty series memo on every call, so game_series normalizes every title as on a first run both times.
+        outputs, seconds, peak = measure(lambda: func(*[{} if df_name == 'series_memo' else frames[df_name] for df_name in inputs]))
+        frames.update(outputs)
+        record('viz', agg_name, seconds, peak)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time each cleaning stage and visualization aggregation on synthetic data.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='numbers of records to generate')
+    parser.add_argument('--chunksize', type=int, default=None, help='load the .csv in chunks of this many rows')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=RESULTS_FILE, help='.csv the results are written to')
+    args = parser.parse_args()
+    params = {'load': {'chunksize': args.chunksize}} if args.chunksize else {}
+
+    rows = []
+    for size in args.sizes:
+        size_rows = benchmark_size(size, params, seed=args.seed)
+        for row in size_rows:
+            print(f"{row['size']:>12,}  {row['script']:<6} {row['step']:<24} {row['seconds']:10.3f}s {row['peak_mb']:10.1f} MB")
+        rows += size_rows
+
+    with open(args.output, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=['script', 'size', 'step', 'seconds', 'peak_mb'])
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
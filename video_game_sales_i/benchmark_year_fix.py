@@ -0,0 +1,97 @@
+import os
+import time
+
+import pandas as pd
+
+from video_game_sales_i.year_fix import extract_year_from_title
+
+# Compare the original iterrows loop of the first year fix with the vectorized extract_year_from_title.
+# Run from the repository root: python -m video_game_sales_i.benchmark_year_fix
+filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vgsales.csv')
+sizes = [10_000, 100_000, 500_000]
+
+
+def baseline_year_from_title(games_missing_year):
+    """Returns the extracted years using the original row-by-row loop and index merge, as the cleaning script had it.  Kept only for timing.
+
+    Its `next` does nothing, so '64' and one- or three-digit words append the previous year again and the merge repeats those rows; the results are not compared.
+    """
+    games_missing_year = games_missing_year.copy()
+    games_missing_year['name_parts'] = games_missing_year['Name'].str.split(' ')
+    games_missing_year['indx'] = games_missing_year.index
+    years = []
+    # The original left new_year unset, and failed if the first number it met was 64 or one or three digits long.
+    new_year = None
+    for i, row in games_missing_year.iterrows():
+        for word in row['name_parts']:
+            if word.isdigit():
+                if len(word) == 2:
+                    if word == '64':
+                        next
+                    elif int(word) > 79:
+                        year = '19' + word
+                        new_year = int(year) - 1
+                    else:
+                        year = '20' + word
+                        new_year = int(year) - 1
+                elif len(word) == 4:
+                    new_year = word.strip()
+                years.append({'indx': i, 'Year': new_year})
+    new_years = pd.DataFrame(years, columns=['indx', 'Year'])
+    games_fix_year = games_missing_year.merge(new_years, on='indx', how='left', suffixes=('_missing', ''))
+    return games_fix_year['Year']
+
+
+def reference_year_from_title(games_missing_year):
+    """Returns the extracted years using the original loop with its bugs fixed: 64 and words of other lengths are skipped, and the first year of each title is kept so the rows line up with the input.  Used to check the vectorized version, not for timing."""
+    games_missing_year = games_missing_year.copy()
+    games_missing_year['name_parts'] = games_missing_year['Name'].str.split(' ')
+    games_missing_year['indx'] = games_missing_year.index
+    years = []
+    for i, row in games_missing_year.iterrows():
+        for word in row['name_parts']:
+            if word.isdigit():
+                if len(word) == 2:
+                    if word == '64':
+                        continue
+                    elif int(word) > 79:
+                        new_year = int('19' + word) - 1
+                    else:
+                        new_year = int('20' + word) - 1
+                elif len(word) == 4:
+                    new_year = word.strip()
+                else:
+                    continue
+                years.append({'indx': i, 'Year': new_year})
+    new_years = pd.DataFrame(years, columns=['indx', 'Year']).drop_duplicates('indx')
+    games_fix_year = games_missing_year.merge(new_years, on='indx', how='left', suffixes=('_missing', ''))
+    return games_fix_year['Year']
+
+
+def time_it(func, *args):
+    """Returns the result of func and the number of seconds it took to run."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    games = pd.read_csv(filename, usecols=['Name', 'Year'], dtype={'Year': 'str', 'Name': 'str'})
+    # Every title in the file stands in for a missing-year record, so roughly 1 in 4 rows contains a year.
+    names = games['Name'].dropna().str.strip()
+
+    for size in sizes:
+        sample = pd.DataFrame({'Name': names.sample(size, replace=True, random_state=0).reset_index(drop=True), 'Year': None})
+        _, loop_seconds = time_it(baseline_year_from_title, sample)
+        vector_years, vector_seconds = time_it(extract_year_from_title, sample['Name'])
+        # The vectorized years must match the fixed loop's on every title: the same year where it found one, and none where it did not.
+        reference_years = reference_year_from_title(sample)
+        found = reference_years.notna().to_numpy()
+        agree = bool((reference_years[found].astype(int).to_numpy() == vector_years[found].to_numpy()).all())
+        extra = int(vector_years[~found].notna().sum())
+        print(f'{size:>10,} rows  loop: {loop_seconds:8.3f}s  vectorized: {vector_seconds:8.3f}s  speedup: {loop_seconds/vector_seconds:6.1f}x  agree: {agree}  extra years: {extra}')
+        assert agree and extra == 0, f'The vectorized years differ from the loop on {size:,} rows'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+import pandas as pd
+import matplotlib.pyplot as plt
+import matplotlib.ticker as mtick
+import seaborn as sns
+
+from great_tables import GT, md, html, style, loc, vals
+
+from video_game_sales_i.conflicts import title_variants
+from video_game_sales_i.discrepancy_audit import DISCREPANCY_STEP, audit_discrepancies, discrepancy_percent, frame_chunks, histogram
+from video_game_sales_i.missingness import impact_of_missing, missing_fraction, missingness_ledger, recovery_totals
+from video_game_sales_i.render import show_artifacts
+
+# The tables and charts of video_game_sales_data_clean.py.  They are kept apart from the pipeline so cleaning runs without importing matplotlib, seaborn or great_tables; the script imports this module only when a render is requested.
+
+# Set palette for visualizations.
+palette = sns.color_palette("Paired")
+sns.set_palette(palette="Paired", n_colors=12)
+
+# Formatting Functions
+def custom_dollar_formatter(x):
+    """Returns $X.XXB if number in millions is 4 or more digits long, returns $X.XXM if number is less than 1. For formatting numbers in tables."""
+    if x > 1000:
+        return f'${x/1000:,.2f}B'
+    elif x >1:
+        return f'${x:,.0f}M'
+    else:
+        return f'${x*1000000:,.0f}'      
+  
+def custom_dollar2f_formatter(x):
+    """Returns $X.XXB if number in millions is 4 or more digits long, otherwise returns $X.XXM. For formatting numbers in tables."""
+    return f'${x/1000:,.2f}B'if x > 1000 else f'${x:,.2f}M'    
+
+def custom_percent_formatter(x):
+    """Returns $X.XXB if number in millions is 4 or more digits long, otherwise returns $X.XXM. For formatting numbers in tables."""
+    return f'{x*100:,.2f}%'    
+
+def custom_formatter(x, pos):
+    """Returns ($X,XXX) if number is less than 0, otherwise returns $X,XXX. For formatting tick mark labels."""
+    return f'(${abs(x*1000000):,.0f})' if x < 0 else f'${x*1000000:,.0f}'    
+
+
+# Table Creation Functions
+def games_sales_table (df, ttl):
+    """Creates a table with game titles and associated global sales."""
+    tbl = GT(df[['Name', 'Global_Sales']]).tab_header(
+        title=ttl).fmt(custom_dollar2f_formatter, columns='Global_Sales').cols_label(
+    Global_Sales=html("Global Sales")).tab_style(
+    style=style.text(color='black'),
+    locations=[loc.body(), loc.column_labels(), loc.header()])
+    return tbl
+
+def game_year_platform_table(df, ttl):
+    """Creates a table with game title, platform, and year."""
+    tbl = GT(df[['Name', 'Year', 'Platform']]).tab_header(title=ttl).tab_style(
+    style=style.text(color='black'),
+    locations=[loc.body(), loc.column_labels(), loc.header()])
+    return tbl
+
+def impact_of_missing_table(impact, field):
+    """Creates a table showing the percentage of data recaptured by data cleaning methods.  impact has the records and sales of all records and of the missing records before and after each fix (see missingness.py)."""
+    # The first row holds the totals for all records.
+    complete_records = impact['records'].iloc[0]
+    games_total_sales = impact['Global_Sales'].iloc[0]
+    missing_list = []
+    for row_heading, records, sales in impact[['row_heading', 'records', 'Global_Sales']].itertuples(index=False):
+        #Create a dictionary for each row of the table.
+        tbl={'row_heading':row_heading,'Number of Records':'{:,.0f}'.format(records), '% of Records':'{:,.2%}'.format(records/complete_records), 'Sales':sales,'% of Sales':'{:,.2%}'.format(sales/games_total_sales)}
+        #Create a list of table row dictionaries.
+        missing_list.append(tbl)
+    #Convert the list of dictionaries into a dataframe.    
+    missing_df = pd.DataFrame(missing_list)
+    #Create a nice looking table from the dataframe.
+    missing_tbl = GT(missing_df).tab_header(title='The Impact of Missing '+field+' Data').tab_stub(rowname_col='row_heading').fmt(custom_dollar_formatter, columns='Sales').tab_style(
+    style=style.text(color='black'),
+    locations=[loc.body(), loc.column_labels(), loc.header(), loc.stub(), loc.stubhead()])
+    return missing_tbl
+
+def compare_tbl(df,field):
+    compare_tbl=(GT(df, rowname_col=field).tab_header(title=f"Missing Year Sales by "+field, subtitle=f"").fmt(custom_dollar_formatter, columns=['Global_Sales_missing','Global_Sales']).fmt(custom_percent_formatter, columns=['frac_missing']).tab_stubhead(label=field).tab_spanner(label='Global Sales', columns=['Global_Sales_missing', 'Global_Sales', 'frac_missing'])).cols_label(
+        Global_Sales=html("Total"),
+        Global_Sales_missing=html("Missing Year"),
+        frac_missing=html("% Missing")).tab_style(
+        style=style.text(color='black'),
+        locations=[loc.body(),loc.stub(),loc.stubhead(), loc.column_header(), loc.header()]).tab_style(
+            style=style.fill("lightblue"), 
+            locations=loc.body(
+            rows=lambda x: x['frac_missing']>.01,)) 
+
+    return compare_tbl 
+
+## TABLES AND CHARTS
+# Each table and chart is drawn by a function that returns it, so it can be shown inline or written to a file in batch mode (see render.py).
+def publisher_examples_table(missing_pub_ex):
+    """Creates a table of example games missing publisher information."""
+    missing_pub_ex_tbl = GT(missing_pub_ex[['Name', 'Year', 'Platform','Publisher']]).tab_header(title='Examples of games missing publisher information').tab_style(
+        style=style.text(color='black'),
+        locations=[loc.body(), loc.column_labels(), loc.header()])
+    return missing_pub_ex_tbl
+
+def still_missing_publisher_table(games_still_missing):
+    """Creates a table of the top highest grossing games with no publisher info."""
+    missing_pub3_tbl = GT(games_still_missing[['Name', 'Year', 'Platform','Global_Sales']]).tab_header(title='Top 10 games still missing publisher information').fmt(custom_dollar2f_formatter, columns='Global_Sales').tab_style(
+        style=style.text(color='black'),
+        locations=[loc.body(), loc.column_labels(), loc.header()])
+    return missing_pub3_tbl
+
+def multi_genre_table(possible_incorrect_genre, incorrect_genre_sales):
+    """Creates a table of game titles that have been assigned multiple genres."""
+    tbl_multi_genre = (GT(possible_incorrect_genre, rowname_col='Name').tab_header(title="Games with Multiple Genres", subtitle=f"Total Global Sales: {custom_dollar_formatter(incorrect_genre_sales)}").tab_stubhead(label='Name').fmt(custom_dollar_formatter, columns=['Global_Sales'])).tab_style(
+        style=style.text(color='black'),
+        locations=[loc.body(), loc.column_labels(), loc.header(), loc.stub(), loc.stubhead()])
+    return tbl_multi_genre
+
+def discrepancy_histogram(bins, discrepancy, discrep_percent):
+    """Creates a histogram of the differences between global sales and the sum of regional sales from the binned counts of the discrepancy audit."""
+    fig, ax = plt.subplots(figsize=(12,10))
+    # The bins are already counted (see discrepancy_audit.py), so draw them as bars one rounding step wide.
+    ax.bar(bins['discrepancy'], bins['count'], width=DISCREPANCY_STEP, color='#ca9161', edgecolor='white')
+
+    sns.despine(bottom=False, left=True)
+    for x, height in zip(bins['discrepancy'], bins['count']):
+        if height > 0:  # Only label bars with non-zero height
+            ax.text(x, height, "{:,.0f}".format(int(height)), ha="center", va="bottom")
+    ax.set_title('Number of Titles with Discrepancies between Global Sales and Total Regional Sales', fontdict={'fontsize': 16})
+    ax.set_xlabel('Difference (in dollars) between Reported Global Sales and the Sum of Regional Sales', fontsize=12, labelpad=12)
+    ax.set_ylabel('')
+    ax.tick_params(axis='y', left=False, labelleft=False)
+    # The x axis is in millions, like the sales fields; the note starts at $15,000, clear of the bar at $0.
+    plt.text(15000/1000000,8000, f'Total discrepancy between Global Sales\nand Total Regional Sales: {custom_dollar_formatter(discrepancy)}\n\nDiscrepancy as a Percentage\nof Global Sales: {custom_percent_formatter(discrep_percent)}', fontdict={'ha':'left', 'size':'large'})
+    ax.xaxis.set_major_formatter(mtick.FuncFormatter(custom_formatter))
+    plt.grid(visible=False)
+    return fig
+
+def games_by_year_chart(game_count_by_year):
+    """Creates a chart of the number of games released by year."""
+    #FacetGrid, Axes Level
+    j = sns.relplot(data=game_count_by_year, x='year', y='count', height=8, aspect=1.5, color='#0173b2')
+    j.ax.set_xlabel(xlabel='')
+    j.ax.set_ylabel(ylabel='Number of Games Released', fontsize=14)
+    j.ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
+    plt.annotate(2009, xy=(2009, 1431), xytext=(2011, 1427), arrowprops={'facecolor':'black', 'width':1, 'headwidth': 6, 'headlength': 12, 'linewidth': 0.5})
+    plt.annotate(2017, xy=(2017, 5), xytext=(2018, 50), arrowprops={'facecolor':'black', 'width':1, 'headwidth': 6, 'headlength': 12, 'linewidth': 0.5})
+    j.fig.suptitle('Number of Published Games by Year', fontsize=16)
+    return j.fig
+
+def report_artifacts(results):
+    """Returns the tables and charts for the blog post as (name, builder, args) artifacts, in the order they appear."""
+    games_unique = results['games_unique']
+    games_missing_year = results['games_missing_year']
+    games_complete_year = results['games_complete_year']
+    games_partial_clean = results['games_partial_clean']
+    games_missing_publisher = results['games_missing_publisher']
+    games_missing_publisher3 = results['games_missing_publisher3']
+    cleaned_games = results['cleaned_games']
+    artifacts = []
+
+    ##FIND TOTALS.
+    # Tag every record with the stage that recovered its year and publisher, and sum its records and sales by those tags once.  Every impact table below is read from these totals (see missingness.py).
+    ledger = missingness_ledger(results)
+    totals = recovery_totals(ledger)
+
+    #Create a table with the top 5 highest selling game titles with null Year.
+    games_missing_year_max_sales = games_missing_year.sort_values('Global_Sales', ascending=False).head(5)
+    artifacts.append(('missing_years_max_sales_tbl', games_sales_table, (games_missing_year_max_sales,'Highest selling games with missing years')))
+
+    # Call game_year_platform_table to create a nice looking table of an example game with year information within its own title. 
+    year_in_title_ex = games_complete_year[games_complete_year['Name']=='FIFA 15']
+    artifacts.append(('year_in_title_tbl', game_year_platform_table, (year_in_title_ex,'A game with year data in the title')))
+
+    # Call game_year_platform_table to create a nice looking table of games with missing years for specific platforms.
+    games_missing_years_platforms_ex = games_unique[games_unique['Name'].isin(['LEGO Batman: The Videogame', 'Call of Duty: Black Ops'])][['Name','Platform', 'Year']].sort_values(['Name','Year'])
+    artifacts.append(('games_missing_years_platforms_tbl', game_year_platform_table, (games_missing_years_platforms_ex,'Games missing year data for certain platforms')))
+
+    artifacts.append(('missing_years_tbl', impact_of_missing_table, (impact_of_missing(totals, 'Year'), 'Year')))
+
+    # Create a nice looking table of the top five highest grossing titles with missing publisher data.
+    #Create a dataframe of the highest grossing 5 games with missing publisher data.
+    games_missing_pub_max = games_missing_publisher[['Name', 'Global_Sales']].sort_values('Global_Sales', ascending=False).head(5)
+    artifacts.append(('missing_pub_max_sales_tbl', games_sales_table, (games_missing_pub_max,'Highest Selling Games with Missing Publisher Data')))
+
+    missing_pub_ex = games_partial_clean[games_partial_clean['Name'].isin(['Teenage Mutant Ninja Turtles', 'NASCAR Thunder 2003'])].sort_values(['Name', 'Year', 'Platform'])
+    artifacts.append(('missing_pub_ex_tbl', publisher_examples_table, (missing_pub_ex,)))
+
+    ### TABLE ANALYSIS OF MISSING PUBLISHERS
+    # Create table with change in missing publishers after subsequent fixes.
+    artifacts.append(('missing_pub_tbl', impact_of_missing_table, (impact_of_missing(totals, 'Publisher'), 'Publisher')))
+
+    # Create a nice table of the top highest grossing games with no publisher info.
+    games_still_missing = games_missing_publisher3[['Name', 'Platform', 'Year', 'Global_Sales']].sort_values('Global_Sales', ascending=False).head(10)
+    artifacts.append(('missing_pub3_tbl', still_missing_publisher_table, (games_still_missing,)))
+    #END MISSING PUBLISHER FIX
+
+    #HOW DO MISSING YEARS AFFECT GENRES THRU THE DECADES?
+    #Since one of the goals is to follow genre popularity over time, it's important to see how each genre is affected by missing years. 
+    # Sum the sales of every genre by recovery stage in one aggregation, and compare the sales still missing a year with each genre's total.
+    genre_compare = missing_fraction(recovery_totals(ledger, 'Genre'), 'Year', 'Genre')
+    #Sort descending by sales.
+    genre_compare.sort_values('Global_Sales', ascending=False, inplace=True)
+    # Create a nice looking table to show the gross and missing year sales by genre.
+    artifacts.append(('genre_compare_tbl', compare_tbl, (genre_compare, 'Genre')))
+
+    ## HOW DO MISSING YEARS AFFECT PUBLISHERS' GROWTH OVER TIME?
+    # Records are counted under their publisher after the publisher fixes.
+    pub_compare = missing_fraction(recovery_totals(ledger, 'Publisher'), 'Year', 'Publisher')
+    pub_compare.sort_values('Global_Sales', ascending=False, inplace=True)
+    artifacts.append(('pub_compare_tbl', compare_tbl, (pub_compare, 'Publisher')))
+
+    # Look for game titles that have been assigned multiple genres.
+    # Every title's genres, publishers and years, with the sales of each, are counted in one pass over the records (see conflicts.py).
+    variants = title_variants(cleaned_games)
+    # Keep only games that are associated with more than one genre.
+    incorrect_genre = variants[(variants['attribute']=='Genre') & (variants['n_values']>1)]
+    possible_incorrect_genre = pd.DataFrame({'Name': incorrect_genre['Name'], 'Genre': incorrect_genre['value'], 'Global_Sales': incorrect_genre['Global_Sales']}).sort_values(['Name', 'Genre'])
+    incorrect_genre_sales = possible_incorrect_genre['Global_Sales'].sum()
+    artifacts.append(('tbl_multi_genre', multi_genre_table, (possible_incorrect_genre, incorrect_genre_sales)))
+
+    # # Culdcept is strategy and is similar to a board game; https://en.wikipedia.org/wiki/Culdcept
+    # # Little Busters! visual novel from Wikipedia; https://en.wikipedia.org/wiki/Little_Busters!
+    # # Steins; Gate: Hiyoku Renri no Darling visual novel ; https://en.wikipedia.org/wiki/Steins;Gate:_My_Darling%27s_Embrace
+    # # Syndicate is strategy with shooting; https://en.wikipedia.org/wiki/Syndicate_(1993_video_game)
+
+    ## DISCREPANCY BETWEEN CALCULATED SALES TOTALS AND GLOBAL SALES TOTALS
+    ## 6772 games total sales do not match global sales
+    # The audit reads cleaned_games a chunk at a time and keeps only binned counts and totals, so no columns are added to it.
+    audit = audit_discrepancies(frame_chunks(cleaned_games))
+    discrepancy = round(audit['discrepancy'])
+    discrep_percent = discrepancy_percent(audit)
+    artifacts.append(('discrepancy_histogram', discrepancy_histogram, (histogram(audit), discrepancy, discrep_percent)))
+
+    # Show the number of games released by year.
+    # Subset on records with a non-null year value.
+    cleaned_complete_year = cleaned_games[~cleaned_games['Year'].isna()]
+    # Make an integer valued year field.
+    cleaned_complete_year['year']=cleaned_complete_year['Year'].astype('int32')
+    game_count_by_year = cleaned_complete_year.value_counts('year').reset_index()
+    artifacts.append(('games_by_year_chart', games_by_year_chart, (game_count_by_year,)))
+    return artifacts
+
+def show_report(results):
+    """Shows the tables and charts for the blog post from the pipeline results."""
+    show_artifacts(report_artifacts(results))
@@ -0,0 +1,100 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from video_game_sales_i.games_store import DATASET_PATH, read_games
+
+# Finds titles whose records disagree on an attribute: a game listed under two genres, released by different publishers on different platforms, or in different years (Hitman 2).
+# Every attribute of every record is reduced to integer codes and all of them are counted and weighted by sales in one grouped pass, instead of summing every sales column by (Name, Genre) and looking for duplicated names for each attribute.
+# Run from the repository root: python -m video_game_sales_i.conflicts --attribute Genre
+CONFLICT_COLUMNS = ['Genre', 'Publisher', 'Year']
+WEIGHT_COLUMN = 'Global_Sales'
+
+
+def title_variants(games, columns=CONFLICT_COLUMNS, weight=WEIGHT_COLUMN):
+    """Returns one row per (attribute, Name, value) found in the records, with its number of records, its sales and its share of the title's sales, and the number of values the title has for that attribute.
+
+    Null values are not variants: a title missing its year on one platform does not conflict with itself.
+    """
+    name_codes, names = pd.factorize(games['Name'])
+    value_codes, values = zip(*(pd.factorize(games[column]) for column in columns))
+    n_values = max([len(uniques) for uniques in values] + [1])
+    weights = games[weight].to_numpy(dtype='float64')
+    # One integer key per (attribute, title, value) of every record, for every attribute at once; null names and values are left out.
+    keys, key_weights = [], []
+    for attribute, codes in enumerate(value_codes):
+        present = (codes >= 0) & (name_codes >= 0)
+        keys.append((attribute * len(names) + name_codes[present].astype(np.int64)) * n_values + codes[present])
+        key_weights.append(weights[present])
+    keys, key_weights = np.concatenate(keys), np.concatenate(key_weights)
+    # One sort groups the keys; every run of equal keys is a variant.
+    order = np.argsort(keys, kind='stable')
+    keys, key_weights = keys[order], key_weights[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=np.int64)
+    variant_keys = keys[starts]
+    records = np.diff(np.r_[starts, len(keys)])
+    sales = np.add.reduceat(key_weights, starts) if len(keys) else np.array([], dtype='float64')
+
+    # The variants of a title are consecutive, so the same runs over the title part of the key give each title's count and sales.
+    title_keys = variant_keys // n_values
+    title_starts = np.flatnonzero(np.r_[True, title_keys[1:] != title_keys[:-1]]) if len(title_keys) else np.array([], dtype=np.int64)
+    title_sizes = np.diff(np.r_[title_starts, len(title_keys)])
+    title_sales = np.add.reduceat(sales, title_starts) if len(title_keys) else np.array([], dtype='float64')
+
+    attributes, name_index = np.divmod(title_keys, len(names)) if len(names) else (title_keys, title_keys)
+    value_index = variant_keys % n_values
+    # The values of each attribute are taken from its own uniques; the variants are sorted by attribute.
+    value_labels = np.empty(len(variant_keys), dtype=object)
+    for attribute, uniques in enumerate(values):
+        in_attribute = attributes == attribute
+        value_labels[in_attribute] = np.asarray(uniques, dtype=object)[value_index[in_attribute]]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = sales / np.repeat(title_sales, title_sizes)
+    return pd.DataFrame({
+        'attribute': np.asarray(columns, dtype=object)[attributes],
+        'Name': np.asarray(names, dtype=object)[name_index],
+        'value': value_labels,
+        'records': records,
+        weight: sales,
+        'share': share,
+        'n_values': np.repeat(title_sizes, title_sizes),
+    })
+
+
+def conflict_report(variants, weight=WEIGHT_COLUMN):
+    """Returns one row per (attribute, Name) with more than one value: the number of values, the values from most to least sales, the title's records and sales, and the share of its sales under its main value."""
+    conflicts = variants[variants['n_values'] > 1]
+    # Largest variant first within each title, so the first value is the main one.
+    conflicts = conflicts.sort_values(['attribute', 'Name', weight], ascending=[True, True, False], kind='stable')
+    grouped = conflicts.groupby(['attribute', 'Name'], sort=True)
+    report = grouped.agg(n_values=('n_values', 'first'), main_value=('value', 'first'), main_share=('share', 'first'), records=('records', 'sum'), **{weight: (weight, 'sum')})
+    report.insert(1, 'values', grouped['value'].agg(lambda values: ' / '.join(str(value) for value in values)))
+    return report.reset_index()
+
+
+def title_conflicts(games, columns=CONFLICT_COLUMNS, weight=WEIGHT_COLUMN):
+    """Creates the variants of every title's attributes and the report of the titles with conflicting values."""
+    variants = title_variants(games, columns, weight)
+    return {'title_variants': variants, 'conflicts': conflict_report(variants, weight)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List the titles whose records have more than one genre, publisher or release year.')
+    parser.add_argument('path', nargs='?', default=DATASET_PATH, help='Parquet dataset written by the cleaning script')
+    parser.add_argument('--attribute', choices=['Genre', 'Publisher', 'year'], help='only list conflicts of this attribute')
+    parser.add_argument('--top', type=int, default=25, help='number of conflicts to list, by sales')
+    args = parser.parse_args()
+
+    # The dataset stores the release year as the integer year column.
+    columns = ['Genre', 'Publisher', 'year']
+    games = read_games(args.path, columns=['Name', WEIGHT_COLUMN] + columns)
+    conflicts = title_conflicts(games, columns)['conflicts']
+    if args.attribute:
+        conflicts = conflicts[conflicts['attribute'] == args.attribute]
+    print(conflicts.groupby('attribute').agg(titles=('Name', 'size'), **{WEIGHT_COLUMN: (WEIGHT_COLUMN, 'sum')}).to_string())
+    print(conflicts.sort_values(WEIGHT_COLUMN, ascending=False).head(args.top).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from video_game_sales_i.games_store import DATASET_PATH, iter_games
+
+# Audits the difference between each record's Global_Sales and the sum of its regional sales, one chunk of records at a time.
+# Sales are in millions rounded to the nearest 10,000, so every difference is a whole number of 0.01 steps.  The audit keeps one count per step, the running totals and the largest differences seen so far, which take the same memory for a thousand records as for a billion.
+# Run from the repository root: python -m video_game_sales_i.discrepancy_audit --batch-size 1000000
+REGIONAL_COLUMNS = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales']
+AUDIT_COLUMNS = ['Name', 'Platform'] + REGIONAL_COLUMNS + ['Global_Sales']
+# Width of a histogram bin, in millions: one rounding step of the sales fields.
+DISCREPANCY_STEP = 0.01
+# Bins run from -MAX_STEPS to +MAX_STEPS steps; larger differences are counted in the outermost bins.
+MAX_STEPS = 10
+TOP_N = 10
+
+
+def new_audit(top_n=TOP_N):
+    """Returns an empty audit to pass to audit_chunk."""
+    return {
+        'counts': np.zeros(2 * MAX_STEPS + 1, dtype=np.int64),
+        'records': 0,
+        'records_off': 0,
+        'records_clipped': 0,
+        'discrepancy': 0.0,
+        'absolute_discrepancy': 0.0,
+        'global_sales': 0.0,
+        'top_n': top_n,
+        'top_offenders': pd.DataFrame({'Name': pd.Series(dtype=object), 'Platform': pd.Series(dtype=object), 'discrepancy': pd.Series(dtype='float64')}),
+    }
+
+
+def audit_chunk(audit, chunk):
+    """Adds one chunk of records to an audit and returns the audit.  The chunk is only read; no columns are added to it."""
+    global_sales = chunk['Global_Sales'].to_numpy(dtype='float64')
+    # Summed in the same column order as the cleaning script's totals column.
+    totals = chunk[REGIONAL_COLUMNS].to_numpy(dtype='float64').sum(axis=1)
+    discrepancy = global_sales - totals
+    # Rounding to whole steps absorbs the floating point error of the sums (and of float32 sales from a chunked load).
+    steps = np.rint(discrepancy / DISCREPANCY_STEP).astype(np.int64)
+    clipped = np.clip(steps, -MAX_STEPS, MAX_STEPS)
+    audit['counts'] += np.bincount(clipped + MAX_STEPS, minlength=2 * MAX_STEPS + 1)
+    audit['records'] += len(chunk)
+    audit['records_off'] += int(np.count_nonzero(steps))
+    audit['records_clipped'] += int(np.count_nonzero(steps != clipped))
+    audit['discrepancy'] += float(discrepancy.sum())
+    audit['absolute_discrepancy'] += float(np.abs(discrepancy).sum())
+    audit['global_sales'] += float(global_sales.sum())
+
+    # Keep the chunk's largest differences and merge them with the ones kept so far.
+    order = np.argsort(-np.abs(steps), kind='stable')[:audit['top_n']]
+    order = order[steps[order] != 0]
+    chunk_top = pd.DataFrame({'Name': chunk['Name'].to_numpy()[order], 'Platform': chunk['Platform'].to_numpy()[order], 'discrepancy': steps[order] * DISCREPANCY_STEP})
+    merged = pd.concat([audit['top_offenders'], chunk_top], ignore_index=True) if len(audit['top_offenders']) else chunk_top
+    keep = np.argsort(-merged['discrepancy'].abs().to_numpy(), kind='stable')[:audit['top_n']]
+    audit['top_offenders'] = merged.iloc[keep].reset_index(drop=True)
+    return audit
+
+
+def audit_discrepancies(chunks, top_n=TOP_N):
+    """Returns the audit of every record in an iterable of dataframes."""
+    audit = new_audit(top_n)
+    for chunk in chunks:
+        audit_chunk(audit, chunk)
+    return audit
+
+
+def frame_chunks(df, chunksize=100_000):
+    """Yields views of chunksize rows of a dataframe that is already in memory."""
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def histogram(audit):
+    """Returns the audit's histogram as a dataframe with the center, in millions, and the number of records of every bin."""
+    return pd.DataFrame({'discrepancy': np.arange(-MAX_STEPS, MAX_STEPS + 1) * DISCREPANCY_STEP, 'count': audit['counts']})
+
+
+def discrepancy_percent(audit):
+    """Returns the total discrepancy as a fraction of total global sales."""
+    return audit['discrepancy'] / audit['global_sales'] if audit['global_sales'] else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit the differences between global sales and the sum of regional sales in the cleaned dataset, one batch at a time.')
+    parser.add_argument('path', nargs='?', default=DATASET_PATH, help='Parquet dataset written by the cleaning script')
+    parser.add_argument('--batch-size', type=int, default=100_000, help='records read at a time')
+    parser.add_argument('--top', type=int, default=TOP_N, help='number of largest differences to list')
+    args = parser.parse_args()
+
+    audit = audit_discrepancies(iter_games(args.path, columns=AUDIT_COLUMNS, batch_size=args.batch_size), top_n=args.top)
+    print(f"Records: {audit['records']:,}, with a discrepancy: {audit['records_off']:,} ({audit['records_off'] / max(audit['records'], 1):.2%})")
+    print(f"Total discrepancy: ${audit['discrepancy'] * 1e6:,.0f} ({discrepancy_percent(audit):.4%} of global sales), absolute: ${audit['absolute_discrepancy'] * 1e6:,.0f}")
+    if audit['records_clipped']:
+        print(f"{audit['records_clipped']:,} records are off by more than {MAX_STEPS} steps and are counted in the outermost bins")
+    bins = histogram(audit)
+    print(bins[bins['count'] > 0].to_string(index=False))
+    print(audit['top_offenders'].to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
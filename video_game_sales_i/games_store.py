@@ -0,0 +1,124 @@
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# The cleaned records are stored once, as a Parquet dataset partitioned by release year (year=1980/, year=1981/, ... and a default partition for null years).
+# The subsets used by the visualizations are filters over this one dataset instead of separate copies of the same rows.
+PARTITIONING = ds.partitioning(pa.schema([('year', pa.int16())]), flavor='hive')
+# Where the cleaning script writes the dataset and every other module reads it from.
+DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'video_game_sales_ii', 'games_final_dataset')
+
+SUBSETS = ['all', 'complete_year', 'complete_pub', 'complete_pub_year']
+
+
+def subset_expression(subset):
+    """Returns the pyarrow filter selecting a subset of the cleaned records, or None for all records."""
+    expressions = {
+        'all': None,
+        'complete_year': pc.field('year').is_valid(),
+        'complete_pub': pc.field('Publisher').is_valid(),
+        'complete_pub_year': pc.field('Publisher').is_valid() & pc.field('year').is_valid(),
+    }
+    return expressions[subset]
+
+
+def subset_mask(df, subset):
+    """Returns a boolean Series selecting a subset of an already loaded dataframe of cleaned records."""
+    masks = {
+        'all': lambda: pd.Series(True, index=df.index),
+        'complete_year': lambda: df['year'].notna(),
+        'complete_pub': lambda: df['Publisher'].notna(),
+        'complete_pub_year': lambda: df['Publisher'].notna() & df['year'].notna(),
+    }
+    return masks[subset]()
+
+
+def write_games_dataset(games_final, path):
+    """Writes the cleaned records to a Parquet dataset partitioned by year, replacing any dataset already at path."""
+    games = games_final.copy()
+    # The integer year replaces the text Year field; it becomes the partition key.
+    games['year'] = pd.to_numeric(games['Year']).astype('Int16')
+    games = games.drop(['Year'], axis=1)
+    table = pa.Table.from_pandas(games, preserve_index=False)
+    # Write next to the old dataset and swap it in, so readers never see a half written dataset and a crash never leaves it without a complete copy.
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    pq.write_to_dataset(table, tmp_path, partitioning=PARTITIONING, basename_template='part-{i}.parquet')
+    replace_directory(tmp_path, path)
+
+
+def replace_directory(new_path, path):
+    """Moves the directory at new_path to path, replacing any directory there.
+
+    The old directory is renamed aside and removed only once the new one is in place, so a crash leaves one complete copy or the other.  Between the two renames, path briefly does not exist.
+    """
+    # The leading dot hides the old copy from pyarrow's dataset discovery while it is inside a dataset.
+    old_path = os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + '.old')
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(new_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def read_games(path, columns=None, subset='all'):
+    """Returns the cleaned records in the dataset at path.
+
+    Only the requested columns are read, from memory mapped files, and the subset filter is applied while reading so rows outside it are never loaded.
+    """
+    table = pq.read_table(path, columns=columns, filters=subset_expression(subset), partitioning=PARTITIONING, memory_map=True)
+    return table.to_pandas()
+
+
+def iter_games(path, columns=None, subset='all', batch_size=100_000):
+    """Yields the cleaned records in the dataset at path as dataframes of at most batch_size rows, so the whole dataset is never in memory at once."""
+    dataset = ds.dataset(path, format='parquet', partitioning=PARTITIONING)
+    for batch in dataset.to_batches(columns=columns, filter=subset_expression(subset), batch_size=batch_size):
+        yield batch.to_pandas()
+
+
+# Name of the partition holding records whose partition value is null.
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+
+def partition_path(path, column, value):
+    """Returns the folder of a hive partition, e.g. games_final_dataset/year=2006."""
+    return os.path.join(path, f"{column}={NULL_PARTITION if pd.isna(value) else int(value)}")
+
+
+def dataset_schema(path, partitioning):
+    """Returns the schema of the dataset at path, including its partition column and pandas metadata."""
+    return ds.dataset(path, format='parquet', partitioning=partitioning).schema
+
+
+def read_partition(path, schema, column, value):
+    """Returns the records of one partition, read from its own folder without listing the rest of the dataset."""
+    part = partition_path(path, column, value)
+    file_schema = schema.remove(schema.get_field_index(column))
+    if not os.path.exists(part):
+        return file_schema.empty_table().to_pandas().assign(**{column: pd.Series(dtype='Int16')})
+    df = pq.read_table(part, schema=file_schema).to_pandas()
+    df[column] = pd.Series(value, index=df.index, dtype='Int16')
+    return df
+
+
+def write_partition(df, path, schema, column, value):
+    """Replaces one partition with the records in df, or removes it if df is empty.  The other partitions are not touched."""
+    part = partition_path(path, column, value)
+    if df.empty:
+        shutil.rmtree(part, ignore_errors=True)
+        return
+    # Use the dataset's own schema so a partition with, say, only null publishers is still written as text.
+    # Its pandas metadata records the nullable dtype of the partition column.
+    file_schema = schema.remove(schema.get_field_index(column))
+    table = pa.Table.from_pandas(df[file_schema.names], schema=file_schema, preserve_index=False).replace_schema_metadata(schema.metadata)
+    tmp_part = part + '.tmp'
+    shutil.rmtree(tmp_part, ignore_errors=True)
+    os.makedirs(tmp_part)
+    pq.write_table(table, os.path.join(tmp_part, 'part-0.parquet'))
+    replace_directory(tmp_part, part)
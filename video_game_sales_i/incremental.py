@@ -0,0 +1,148 @@
+import argparse
+import json
+import math
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from video_game_sales_i.games_store import PARTITIONING, dataset_schema, read_partition, write_games_dataset, write_partition
+from video_game_sales_i.video_game_sales_data_clean import DATA_DIR, DATASET_PATH, load, run_pipeline, run_stages
+
+# Weekly sales deltas are applied without rerunning the whole pipeline.  Every cleaning rule only compares records with the same Name, so only the titles in the delta are cleaned again.
+# The loaded (uncleaned) records are kept in a Parquet dataset partitioned by a hash of Name, so the records of the titles in a delta can be read and rewritten without touching the rest.
+RAW_DATASET_PATH = os.path.join(DATA_DIR, 'games_clean_dataset')
+# Parquet readers skip files starting with an underscore, so the totals can live inside the dataset folder.
+TOTALS_FILE = '_totals.json'
+N_BUCKETS = 256
+RAW_PARTITIONING = ds.partitioning(pa.schema([('name_bucket', pa.int16())]), flavor='hive')
+
+
+def name_buckets(names):
+    """Returns the raw dataset partition of each game title."""
+    return (pd.util.hash_pandas_object(pd.Series(names), index=False).to_numpy() % N_BUCKETS).astype('int16')
+
+
+def totals(games_unique):
+    """Returns the record count and global sales the missing data tables are measured against."""
+    return {'complete_records': int(games_unique.shape[0]), 'games_total_sales': float(games_unique['Global_Sales'].sum())}
+
+
+def init_state(results, raw_path=RAW_DATASET_PATH):
+    """Writes the loaded records and totals of a full pipeline run, the starting point for apply_delta."""
+    games_clean = results['games_clean'].copy()
+    games_clean['name_bucket'] = name_buckets(games_clean['Name'])
+    tmp_path = raw_path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    pq.write_to_dataset(pa.Table.from_pandas(games_clean, preserve_index=False), tmp_path, partitioning=RAW_PARTITIONING, basename_template='part-{i}.parquet')
+    with open(os.path.join(tmp_path, TOTALS_FILE), 'w') as file:
+        json.dump(totals(results['games_unique']), file)
+    shutil.rmtree(raw_path, ignore_errors=True)
+    os.replace(tmp_path, raw_path)
+
+
+def read_totals(raw_path=RAW_DATASET_PATH):
+    """Returns the totals stored with the loaded records, as kept up to date by apply_delta."""
+    with open(os.path.join(raw_path, TOTALS_FILE)) as file:
+        return json.load(file)
+
+
+def check_totals(raw_path=RAW_DATASET_PATH, params=None):
+    """Returns the stored totals, the totals recomputed from every loaded record, and whether they agree.  A disagreement means a delta was applied to the records without its totals, or the other way around."""
+    games_clean = pq.read_table(raw_path, partitioning=RAW_PARTITIONING).to_pandas().drop(['name_bucket'], axis=1)
+    stored = read_totals(raw_path)
+    recomputed = totals(run_stages({'games_clean': games_clean}, params, first='dedupe', last='dedupe')['games_unique'])
+    agree = stored.keys() == recomputed.keys() and all(math.isclose(stored[key], recomputed[key], rel_tol=1e-9, abs_tol=1e-6) for key in stored)
+    return stored, recomputed, agree
+
+
+def read_titles(raw_path, names):
+    """Returns the loaded records of the given titles, reading only the partitions they can be in."""
+    expression = pc.field('name_bucket').isin(np.unique(name_buckets(names)).tolist()) & pc.field('Name').isin(list(names))
+    return pq.read_table(raw_path, filters=expression, partitioning=RAW_PARTITIONING).to_pandas().drop(['name_bucket'], axis=1)
+
+
+def replace_records(old, delta):
+    """Returns the records of the titles in the delta after it is applied.  Delta records replace the old records with the same Name and Platform; other records are kept."""
+    replaced = pd.MultiIndex.from_frame(old[['Name', 'Platform']]).isin(pd.MultiIndex.from_frame(delta[['Name', 'Platform']]))
+    return pd.concat([old[~replaced], delta], axis=0, ignore_index=True)
+
+
+def apply_delta(delta_filename, raw_path=RAW_DATASET_PATH, dataset_path=DATASET_PATH, params=None):
+    """Applies a .csv of new or changed sales records and updates the loaded records, the totals and the final dataset in place.
+
+    Only the titles in the delta are read and cleaned again, and only the partitions holding them are rewritten, so the work is proportional to the delta rather than the full history.
+    Returns a summary of what changed.
+    """
+    delta = load(delta_filename)['games_clean']
+    # Records without a title cannot be grouped with anything, so they are left out.
+    delta = delta[delta['Name'].notna()]
+    names = delta['Name'].unique()
+
+    # Clean the affected titles as they were and as they are now.
+    old_raw = read_titles(raw_path, names)
+    new_raw = replace_records(old_raw, delta[old_raw.columns])
+    old_results = run_stages({'games_clean': old_raw}, params)
+    new_results = run_stages({'games_clean': new_raw}, params)
+
+    # Rewrite the raw partitions of the affected titles.
+    new_raw['name_bucket'] = name_buckets(new_raw['Name'])
+    raw_schema = dataset_schema(raw_path, RAW_PARTITIONING)
+    for bucket in np.unique(name_buckets(names)):
+        part = read_partition(raw_path, raw_schema, 'name_bucket', bucket)
+        part = pd.concat([part[~part['Name'].isin(names)], new_raw[new_raw['name_bucket'] == bucket]], axis=0, ignore_index=True)
+        write_partition(part, raw_path, raw_schema, 'name_bucket', bucket)
+
+    # Update the totals by the difference between the old and new unique records of the affected titles.
+    state_totals = read_totals(raw_path)
+    old_totals, new_totals = totals(old_results['games_unique']), totals(new_results['games_unique'])
+    for key in state_totals:
+        state_totals[key] += new_totals[key] - old_totals[key]
+    with open(os.path.join(raw_path, TOTALS_FILE), 'w') as file:
+        json.dump(state_totals, file)
+
+    # Rewrite the year partitions of the final dataset that held, or now hold, an affected title.
+    new_final = new_results['games_final'].copy()
+    new_final['year'] = pd.to_numeric(new_final['Year']).astype('Int16')
+    new_final = new_final.drop(['Year'], axis=1)
+    old_years = pd.to_numeric(old_results['games_final']['Year']).astype('Int16')
+    years = pd.concat([old_years, new_final['year']]).drop_duplicates()
+    final_schema = dataset_schema(dataset_path, PARTITIONING)
+    for year in years:
+        part = read_partition(dataset_path, final_schema, 'year', year)
+        in_year = new_final['year'].isna() if pd.isna(year) else new_final['year'] == year
+        part = pd.concat([part[~part['Name'].isin(names)], new_final[in_year.fillna(False).to_numpy()]], axis=0, ignore_index=True)
+        write_partition(part, dataset_path, final_schema, 'year', year)
+
+    return {'titles': len(names), 'delta_records': len(delta), 'year_partitions': len(years), 'totals': state_totals}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply a delta of new or changed video game sales records to the cleaned dataset.')
+    parser.add_argument('delta', nargs='?', help='.csv with the same columns as vgsales.csv')
+    parser.add_argument('--init', action='store_true', help='run the full pipeline and store the state later deltas are applied to')
+    parser.add_argument('--check', action='store_true', help='recompute the record count and global sales from every stored record and compare them with the stored totals')
+    args = parser.parse_args()
+    if args.init or not os.path.exists(RAW_DATASET_PATH):
+        results = run_pipeline()
+        write_games_dataset(results['games_final'], DATASET_PATH)
+        init_state(results)
+        print(f"Stored the loaded records in {RAW_DATASET_PATH}")
+    if args.delta:
+        summary = apply_delta(args.delta)
+        print(f"Applied {summary['delta_records']:,} records for {summary['titles']:,} titles; rewrote {summary['year_partitions']} year partitions.")
+        print(f"Totals: {summary['totals']['complete_records']:,} records, {summary['totals']['games_total_sales']:,.2f} million in global sales")
+    if args.check:
+        stored, recomputed, agree = check_totals()
+        print(f"Stored totals: {stored}\nRecomputed:    {recomputed}\n{'The totals agree' if agree else 'The totals differ'}")
+        if not agree:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import tracemalloc
+
+import pandas as pd
+
+# Columns read from the Kaggle .csv; "Rank" is left out because it is redundant.
+STRING_COLUMNS = ['Name', 'Platform', 'Genre', 'Publisher']
+CATEGORY_COLUMNS = ['Platform', 'Genre', 'Publisher']
+SALES_COLUMNS = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Global_Sales']
+NA_VALUES = {'Unknown', 'unknown', 'UNKNOWN', 'NaN', 'nan', 'NAN'}
+
+# Column order of the frame returned by read_csv in the cleaning script.
+CSV_COLUMNS = ['Name', 'Platform', 'Year', 'Genre', 'Publisher', 'NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Global_Sales']
+
+
+def compact_chunk(chunk):
+    """Strips white space from one chunk of the .csv and converts it to the compact schema."""
+    compact = pd.DataFrame(index=chunk.index)
+    for col in CSV_COLUMNS:
+        if col in STRING_COLUMNS:
+            values = chunk[col].str.strip()
+            compact[col] = values.astype('category') if col in CATEGORY_COLUMNS else values
+        elif col == 'Year':
+            # The Year field can only be an integer type once it allows nulls, so use pandas' nullable small integer.
+            compact[col] = pd.to_numeric(chunk[col].str.strip(), errors='coerce').astype('Int16')
+        else:
+            compact[col] = chunk[col].astype('float32')
+    return compact
+
+
+def read_vgsales_chunked(filename, chunksize=100_000):
+    """Returns the video game sales data read chunksize rows at a time, along with the peak memory in bytes used while reading.
+
+    Platform, Genre and Publisher are categorical, Year is a nullable Int16 and the regional sales are float32.  Only one chunk of the raw text is held in memory at a time.
+    """
+    # Only start (and stop) tracing if nobody else is already tracing memory.  A caller's trace is left as it is, peak included, so the peak is then measured from what was traced when reading started: an upper bound if the caller's peak was already higher.
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    traced_before = tracemalloc.get_traced_memory()[0]
+
+    reader = pd.read_csv(filename, usecols=CSV_COLUMNS, dtype={col: 'str' for col in STRING_COLUMNS + ['Year']}, na_values=NA_VALUES, chunksize=chunksize)
+    chunks = [compact_chunk(chunk) for chunk in reader]
+
+    # Each chunk has its own categories.  Give every chunk the union of them so concat keeps the categorical codes instead of falling back to strings.
+    for col in CATEGORY_COLUMNS:
+        categories = pd.Index(sorted(set().union(*[chunk[col].cat.categories for chunk in chunks])))
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    games = pd.concat(chunks, ignore_index=True)
+
+    peak = tracemalloc.get_traced_memory()[1] - traced_before
+    if started_tracing:
+        tracemalloc.stop()
+    return games, peak
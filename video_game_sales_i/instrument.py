@@ -0,0 +1,123 @@
+import itertools
+import json
+import os
+import re
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Measures every stage of the cleaning pipeline and collects the data integrity checks and metrics the stages record, for a JSON report of each run.
+# Stages call check_equal and metric wherever the original script had an assert or a number worth keeping.  Outside of an instrumented run nothing is recorded, so uninstrumented runs and long lived processes do not accumulate records; a failed check still warns.
+# The checks and metrics of the stage run_stage is running, or None outside of it.
+_recorded = None
+
+
+def check_equal(name, actual, expected):
+    """Records whether actual equals expected, and warns if it does not.  Returns True if the check passed."""
+    passed = bool(actual == expected)
+    if _recorded is not None:
+        _recorded['checks'].append({'name': name, 'passed': passed, 'actual': json_value(actual), 'expected': json_value(expected)})
+    if not passed:
+        warnings.warn(f"Check failed: {name} ({actual!r} != {expected!r})", stacklevel=2)
+    return passed
+
+
+def metric(name, value):
+    """Records a number describing what a stage did, such as the records or sales it recaptured."""
+    if _recorded is not None:
+        _recorded['metrics'][name] = json_value(value)
+
+
+def json_value(value):
+    """Returns value as a plain Python number or string, so numpy and pandas scalars can be written to JSON."""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+
+def peak_rss_bytes():
+    """Returns the peak resident memory of the process in bytes."""
+    try:
+        with open('/proc/self/status') as file:
+            return int(re.search(r'VmHWM:\s+(\d+) kB', file.read()).group(1)) * 1024
+    except (OSError, AttributeError):
+        import resource
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def frame_stats(df):
+    """Returns the number of rows and the null count of every column of a dataframe."""
+    if not isinstance(df, pd.DataFrame):
+        return None
+    return {'rows': int(df.shape[0]), 'nulls': {col: int(count) for col, count in df.isna().sum().items()}}
+
+
+def run_stage(stage_name, func, frames, params):
+    """Runs one stage and returns its outputs along with a record of its wall time, CPU time, peak memory, row and null counts, checks and metrics."""
+    global _recorded
+    recorded = _recorded = {'checks': [], 'metrics': {}}
+    # The process' peak is read, not reset, so callers measuring the whole process keep their reading.
+    peak_before = peak_rss_bytes()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        outputs = func(*frames.values(), **params)
+    finally:
+        _recorded = None
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    peak_after = peak_rss_bytes()
+    record = {
+        'stage': stage_name,
+        'cached': False,
+        'wall_seconds': round(wall, 4),
+        'cpu_seconds': round(cpu, 4),
+        # The process' peak so far: an upper bound on the stage's own peak.
+        'peak_rss_mb': round(peak_after / 1024**2, 1),
+        # How much the stage raised that peak; 0 when it stayed below an earlier stage's.
+        'peak_rss_growth_mb': round((peak_after - peak_before) / 1024**2, 1),
+        'inputs': {df_name: frame_stats(df) for df_name, df in frames.items()},
+        'outputs': {df_name: frame_stats(df) for df_name, df in outputs.items()},
+        'checks': recorded['checks'],
+        'metrics': recorded['metrics'],
+    }
+    return outputs, record
+
+
+def cached_stage(stage_name, outputs):
+    """Returns the record of a stage whose outputs were read from the cache.  Its checks ran when the cache was written."""
+    return {'stage': stage_name, 'cached': True, 'outputs': {df_name: frame_stats(df) for df_name, df in outputs.items()}}
+
+
+def new_report(params):
+    """Returns an empty run report to pass to run_pipeline."""
+    return {'started': datetime.now(timezone.utc).isoformat(timespec='microseconds'), 'params': params, 'stages': []}
+
+
+def finish_report(report):
+    """Adds the totals over all stages to a run report and returns it."""
+    stages = report['stages']
+    report['wall_seconds'] = round(sum(stage.get('wall_seconds', 0) for stage in stages), 4)
+    report['cpu_seconds'] = round(sum(stage.get('cpu_seconds', 0) for stage in stages), 4)
+    report['checks_failed'] = [f"{stage['stage']}: {check['name']}" for stage in stages for check in stage.get('checks', []) if not check['passed']]
+    return report
+
+
+def write_report(report, report_dir):
+    """Writes a run report to report_dir as JSON, named by the time the run started, and returns its path.  A report never replaces another: runs started at the same moment get a numbered suffix."""
+    os.makedirs(report_dir, exist_ok=True)
+    stem = os.path.join(report_dir, f"run_{report['started'].replace(':', '').replace('+0000', 'Z')}")
+    for attempt in itertools.count():
+        path = f"{stem}.json" if attempt == 0 else f"{stem}_{attempt}.json"
+        try:
+            # 'x' fails if the file exists, so two processes never write the same report file.
+            with open(path, 'x') as file:
+                json.dump(finish_report(report), file, indent=2, default=str)
+            return path
+        except FileExistsError:
+            continue
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+# A ledger of missing data: every cleaned record tagged with the stage that recovered its Year and its Publisher, or 'never'.
+# Every impact table and every breakdown of missing sales (by Genre, Publisher, Platform, or any region's sales) is read from one grouped aggregation of the ledger, instead of summing each intermediate dataframe again.
+SALES_COLUMNS = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Global_Sales']
+# The steps of each fix in the order they apply.  'complete' records had the field from the start.
+YEAR_STEPS = ['complete', 'year_fix_1', 'year_fix_2', 'never']
+PUBLISHER_STEPS = ['complete', 'publisher_fix_1', 'publisher_fix_2', 'never']
+# The ledger column of each field, and the dataframes of records still missing it before the first fix, after the first fix and after the second fix.
+RECOVERY = {
+    'Year': ('year_recovered', YEAR_STEPS, ['games_missing_year', 'games_missing_year2', 'games_missing_year3']),
+    'Publisher': ('publisher_recovered', PUBLISHER_STEPS, ['games_missing_publisher', 'games_missing_publisher2', 'games_missing_publisher3']),
+}
+# Row headings of the impact tables, one for each number of fixes applied.
+IMPACT_ROWS = ['All Records', 'Missing Records Before Fix', 'Missing Records After First Fix', 'Missing Records After Second Fix']
+
+
+def recovery_steps(frames, index):
+    """Returns the step of each fix that recovered every record in index: 0 had the field, 1 the first fix, 2 the second fix, 3 still missing.
+
+    frames holds the still missing dataframes named in RECOVERY.  A record still missing after a fix is also in the dataframes before it, so its step is the number of them it is in.
+    """
+    steps = {}
+    for field, (column, _, missing_names) in RECOVERY.items():
+        steps[column] = pd.Series(sum(index.isin(frames[df_name].index).astype(np.int8) for df_name in missing_names), index=index)
+    return steps
+
+
+def missingness_ledger(results):
+    """Returns cleaned_games with year_recovered and publisher_recovered columns naming the stage that recovered each record's Year and Publisher."""
+    cleaned_games = results['cleaned_games']
+    ledger = cleaned_games.copy()
+    steps = recovery_steps(results, cleaned_games.index)
+    for column, step_names, _ in RECOVERY.values():
+        ledger[column] = pd.Categorical.from_codes(steps[column].to_numpy(), categories=step_names, ordered=True)
+    return ledger
+
+
+def recovery_totals(ledger, by=None):
+    """Returns the records and sales of each (by, year_recovered, publisher_recovered) group of the ledger.  This is the one aggregation the tables below read from."""
+    keys = ([by] if by else []) + [column for column, _, _ in RECOVERY.values()]
+    return ledger.groupby(keys, observed=True).agg(records=('Global_Sales', 'size'), **{col: (col, 'sum') for col in SALES_COLUMNS})
+
+
+def impact_of_missing(totals, field, value='Global_Sales'):
+    """Returns the records and sales of all records and of those still missing field before each fix, from recovery_totals(ledger)."""
+    column, step_names, _ = RECOVERY[field]
+    by_step = totals.groupby(level=column, observed=False)[['records', value]].sum().reindex(step_names, fill_value=0)
+    # A record missing after n fixes was recovered at a later step or never; sum from the last step back.
+    still_missing = by_step.iloc[::-1].cumsum().iloc[::-1]
+    impact = still_missing.reset_index(drop=True)
+    impact.insert(0, 'row_heading', IMPACT_ROWS)
+    return impact
+
+
+def missing_fraction(totals, field, by, value='Global_Sales'):
+    """Returns the sales of each by value that are still missing field after every fix, its total sales and the fraction missing, for the values with any record still missing.  totals is recovery_totals(ledger, by)."""
+    column, _, _ = RECOVERY[field]
+    per_key = totals.groupby(level=[by, column], observed=True)[['records', value]].sum()
+    missing = per_key[per_key.index.get_level_values(column) == 'never'].droplevel(column)
+    missing = missing[missing['records'] > 0]
+    compare = pd.DataFrame({by: missing.index, f'{value}_missing': missing[value].to_numpy()})
+    compare[value] = per_key[value].groupby(level=by).sum().reindex(missing.index).to_numpy()
+    compare['frac_missing'] = compare[f'{value}_missing'] / compare[value]
+    return compare
@@ -0,0 +1,95 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from video_game_sales_i.games_store import write_games_dataset
+from video_game_sales_i.missingness import recovery_steps
+from video_game_sales_i.video_game_sales_data_clean import DATASET_PATH, STAGES, filename, run_stages
+
+# The year and publisher fixes only compare records with the same Name, so the unique records are split into shards by a hash of Name and each shard is cleaned in its own process.
+# Loading and deduplication run once, before sharding.
+SHARDED_STAGES = [stage_name for stage_name, _, _ in STAGES[2:]]
+
+# The serial stages stack their subsets with pd.concat, so a dataframe is not always in index order.  These are the fixes to sort the merged rows by, before the index, to put them back in the serial order.
+# year_recovered: 0 had a year, 1 year from the title, 2 year from another platform, 3 still missing.  publisher_recovered: 0 had a publisher, 1 name rule, 2 name_year rule, 3 still missing.  See missingness.py.
+# Dataframes not listed here are in index order.
+SERIAL_ORDER = {
+    'games_1': ['year_recovered'],
+    'games_2': ['year_recovered'],
+    'games_partial_clean': ['year_recovered'],
+    'games_missing_publisher': ['year_recovered'],
+    'games_fix': ['year_recovered'],
+    'games_missing_publisher2': ['year_recovered'],
+    'games_missing_publisher3': ['year_recovered'],
+    'games_3': ['publisher_recovered', 'year_recovered'],
+    'cleaned_games': ['publisher_recovered', 'year_recovered'],
+    'publisher_recaptured': ['publisher_recovered', 'year_recovered'],
+    'games_final': ['publisher_recovered', 'year_recovered'],
+}
+
+
+def shard_ids(names, n_shards):
+    """Returns the shard of each game title.  All records of a title land in the same shard."""
+    return pd.util.hash_pandas_object(pd.Series(names), index=False).to_numpy() % n_shards
+
+
+def clean_shard(games_unique, params):
+    """Runs the year and publisher fixes on one shard of the unique records.  Runs in a worker process."""
+    results = run_stages({'games_unique': games_unique}, params, first=SHARDED_STAGES[0], last=SHARDED_STAGES[-1])
+    del results['games_unique']
+    return results
+
+
+def merge_shards(shard_results, index):
+    """Stacks the dataframes of every shard and puts their rows in the order the serial stages leave them in."""
+    merged = {df_name: pd.concat([results[df_name] for results in shard_results], axis=0) for df_name in shard_results[0]}
+    steps = recovery_steps(merged, index)
+    for df_name, df in merged.items():
+        # np.lexsort sorts by the last key first.
+        keys = [df.index.to_numpy()] + [steps[step].reindex(df.index).to_numpy() for step in reversed(SERIAL_ORDER.get(df_name, []))]
+        merged[df_name] = df.iloc[np.lexsort(keys)]
+    return merged
+
+
+def run_parallel(filename=filename, params=None, n_workers=None):
+    """Runs every stage like run_pipeline, with the year and publisher fixes spread over n_workers processes (default: one per CPU), and returns the same dictionary of dataframes.
+
+    The stage cache is not used.
+    """
+    params = dict(params or {})
+    params['load'] = {'filename': filename, **params.get('load', {})}
+    results = run_stages({}, params, first='load', last='dedupe')
+    games_unique = results['games_unique']
+
+    n_workers = n_workers or os.cpu_count()
+    shards = shard_ids(games_unique['Name'], n_workers)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        shard_results = list(executor.map(clean_shard, [games_unique[shards == i] for i in range(n_workers)], [params] * n_workers))
+    results.update(merge_shards(shard_results, games_unique.index))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Clean the video game sales data with the year and publisher fixes spread over several processes.')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: one per CPU)')
+    parser.add_argument('--check', action='store_true', help='also run the serial stages and check every dataframe is identical')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_parallel(n_workers=args.workers)
+    print(f"Cleaned {results['games_unique'].shape[0]:,} records in {time.perf_counter() - start:.2f}s")
+    if args.check:
+        serial = run_stages({}, {'load': {'filename': filename}}, first='load')
+        different = [df_name for df_name in serial if not serial[df_name].equals(results[df_name])]
+        print(f"Dataframes different from the serial run: {different or 'none'}")
+
+    write_games_dataset(results['games_final'], DATASET_PATH)
+    print(f"Wrote {results['games_final'].shape[0]:,} records to {DATASET_PATH}")
+
+
+if __name__ == '__main__':
+    main()
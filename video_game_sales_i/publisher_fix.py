@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+# The rules used to recapture missing publishers, in the order they are applied, with the fields a record must share with a record that has a publisher.
+PUBLISHER_RULES = [('name', ['Name']), ('name_year', ['Name', 'Year'])]
+
+
+def key_codes(complete, missing, keys):
+    """Returns integer codes for the key fields of the complete and missing records, numbered over both so equal keys get equal codes.  Keys with a null field get -1."""
+    codes = np.zeros(len(complete) + len(missing), dtype='int64')
+    has_null = np.zeros(len(codes), dtype=bool)
+    for col in keys:
+        # Categorical columns are factorized by their existing codes; text columns are hashed once here.
+        col_codes, uniques = pd.factorize(pd.concat([complete[col], missing[col]], ignore_index=True))
+        has_null |= col_codes < 0
+        # Renumber after adding each field so the combined codes never grow past the number of records.
+        codes, _ = pd.factorize(codes * (len(uniques) + 1) + col_codes)
+    codes[has_null] = -1
+    return codes[:len(complete)], codes[len(complete):]
+
+
+def unique_publisher_lookup(complete, missing, keys):
+    """Returns a Series aligned to missing with the publisher of the complete records sharing its key fields.
+
+    The lookup index (key code -> publisher code) is built once from the complete records.  Keys with no complete record, or with more than one publisher among them, stay null.
+    """
+    complete_keys, missing_keys = key_codes(complete, missing, keys)
+    publisher_codes, publishers = pd.factorize(complete['Publisher'])
+    if len(publishers) == 0:
+        return pd.Series(None, index=missing.index, dtype=complete['Publisher'].dtype)
+
+    # Count the distinct publishers of every key.
+    known = (complete_keys >= 0) & (publisher_codes >= 0)
+    pairs = np.unique(np.stack([complete_keys[known], publisher_codes[known]]), axis=1)
+    n_keys = max(complete_keys.max(initial=-1), missing_keys.max(initial=-1)) + 1
+    publishers_per_key = np.bincount(pairs[0], minlength=n_keys)
+
+    # Index from key code to publisher code, -1 where the publisher is unknown or ambiguous.
+    index = np.full(n_keys + 1, -1, dtype='int64')
+    single = publishers_per_key[pairs[0]] == 1
+    index[pairs[0][single]] = pairs[1][single]
+    # Missing records with a null key land on the last slot, which always stays -1.
+    found = index[np.where(missing_keys >= 0, missing_keys, n_keys)]
+
+    recaptured = pd.Series(publishers.take(np.where(found >= 0, found, 0)), index=missing.index, dtype=complete['Publisher'].dtype)
+    return recaptured.where(found >= 0)
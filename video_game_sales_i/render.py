@@ -0,0 +1,139 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Tables and charts are described as artifacts, (name, builder, args) tuples, where builder(*args) returns a great_tables GT or a matplotlib figure.
+# matplotlib is imported by the functions that draw, so importing this module to describe artifacts stays cheap.
+# show_artifacts draws them one at a time like the original scripts.  render_artifacts writes them to files from a pool of headless workers and skips every artifact whose data, code and style have not changed since the last run.
+MANIFEST_FILE = 'render_manifest.json'
+TABLE_FORMATS = ['html']
+FIGURE_FORMATS = ['png', 'pdf']
+# Bump this to redraw every artifact after a change of style the hash cannot see, e.g. fonts installed on the machine.
+STYLE_VERSION = 1
+
+
+def content_hash(value, digest=None):
+    """Returns a sha256 digest of the data in value.  Dataframes and Series are hashed by their values, index, columns and types rather than pickled, so equal data always gives the same hash."""
+    digest = digest or hashlib.sha256()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        digest.update(repr(value.dtypes.to_dict() if isinstance(value, pd.DataFrame) else (value.name, value.dtype)).encode())
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr(list(value.columns)).encode())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            content_hash(item, digest)
+    elif isinstance(value, dict):
+        digest.update(f'dict{len(value)}'.encode())
+        for key in sorted(value, key=repr):
+            content_hash(key, digest)
+            content_hash(value[key], digest)
+    else:
+        digest.update(pickle.dumps(value))
+    return digest
+
+
+def style_settings():
+    """Returns the matplotlib settings in effect, which hold the palette set by the report modules, or {} if matplotlib has not been imported.  The backend is left out; workers draw with Agg."""
+    if 'matplotlib' not in sys.modules:
+        return {}
+    import matplotlib
+    return {key: repr(value) for key, value in sorted(matplotlib.rcParams.items()) if not key.startswith('backend')}
+
+
+def artifact_hash(builder, args, formats):
+    """Returns the hash of everything an artifact's files depend on: its data, the code that draws it, the style and the output formats.
+
+    The code is the whole module of the builder, so its formatting helpers and the palette it sets are covered as well as the builder itself.
+    """
+    digest = content_hash(list(args))
+    digest.update(inspect.getsource(inspect.getmodule(builder)).encode())
+    digest.update(json.dumps([STYLE_VERSION, style_settings()]).encode())
+    digest.update(repr(formats).encode())
+    return digest.hexdigest()
+
+
+def is_table(obj):
+    """Returns True for great_tables tables, False for matplotlib figures."""
+    return hasattr(obj, 'as_raw_html')
+
+
+def show_artifacts(artifacts):
+    """Draws every artifact in turn and shows it."""
+    import matplotlib.pyplot as plt
+    for name, builder, args in artifacts:
+        obj = builder(*args)
+        if is_table(obj):
+            obj.show()
+        else:
+            plt.show()
+
+
+def render_artifact(name, builder, args, out_dir, table_formats, figure_formats):
+    """Draws one artifact and writes it to out_dir in each format.  Returns the names of the files written.  Runs in a worker process."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    files = []
+    # Style changes made while drawing (sns.set_context and the like) end with the artifact, so workers draw the same no matter what they drew before.
+    with matplotlib.rc_context():
+        obj = builder(*args)
+        if is_table(obj):
+            for fmt in table_formats:
+                path = os.path.join(out_dir, f'{name}.{fmt}')
+                if fmt == 'html':
+                    with open(path, 'w', encoding='utf-8') as file:
+                        file.write(obj.as_raw_html(make_page=True))
+                else:
+                    # PNG and PDF tables are drawn by a headless browser (see GT.save).
+                    obj.save(path)
+                files.append(os.path.basename(path))
+        else:
+            for fmt in figure_formats:
+                path = os.path.join(out_dir, f'{name}.{fmt}')
+                obj.savefig(path)
+                files.append(os.path.basename(path))
+            plt.close('all')
+    return files
+
+
+def render_artifacts(artifacts, out_dir, workers=None, table_formats=TABLE_FORMATS, figure_formats=FIGURE_FORMATS):
+    """Writes every artifact to out_dir, drawing the ones that changed since the last run in a pool of workers.  Returns the names of the artifacts that were drawn."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+
+    names = [name for name, _, _ in artifacts]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Artifact names must be unique: {sorted(name for name in set(names) if names.count(name) > 1)}")
+
+    changed = []
+    for name, builder, args in artifacts:
+        key = artifact_hash(builder, args, (table_formats, figure_formats))
+        entry = manifest.get(name)
+        if entry and entry['hash'] == key and all(os.path.exists(os.path.join(out_dir, f)) for f in entry['files']):
+            continue
+        changed.append((name, builder, args, key))
+
+    if changed:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(render_artifact, name, builder, args, out_dir, table_formats, figure_formats) for name, builder, args, _ in changed]
+            try:
+                for (name, _, _, key), future in zip(changed, futures):
+                    manifest[name] = {'hash': key, 'files': future.result()}
+            finally:
+                # Keep the artifacts drawn so far even if one of them failed; the rest are drawn on the next run.
+                with open(manifest_path + '.tmp', 'w') as file:
+                    json.dump(manifest, file, indent=2, sort_keys=True)
+                os.replace(manifest_path + '.tmp', manifest_path)
+    return [name for name, _, _, _ in changed]
@@ -0,0 +1,343 @@
+import argparse
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from video_game_sales_i.games_store import DATASET_PATH, PARTITIONING, iter_games, read_games
+
+# Approximate counts and best sellers of the cleaned dataset in a fixed amount of memory, for catalogs too large to group in full.
+# Records are read one batch at a time and folded into small sketches, which merge across batches and across worker processes into the same result:
+#  - a HyperLogLog of the titles of every year and every platform, for the number of distinct titles;
+#  - a count-min table of sales by title and by publisher, for the sales of any one title or publisher;
+#  - a space-saving summary of the titles and publishers with the most sales, for the top sellers and publisher rankings.
+# The number of records of every year is a plain counter, as there are only a few dozen years.  Every estimate comes with its error bound.
+# The scripts still compute everything exactly; this is a separate mode.  Run from the repository root: python -m video_game_sales_i.sketches --approximate --workers 4
+SKETCH_COLUMNS = ['Name', 'Platform', 'Publisher', 'year', 'Global_Sales']
+# Columns whose values each get their own count of distinct titles.
+DISTINCT_COLUMNS = ['year', 'Platform']
+# Columns whose values are ranked by sales.
+HEAVY_HITTER_COLUMNS = ['Name', 'Publisher']
+SALES_COLUMN = 'Global_Sales'
+# 2**12 registers of one byte per count; the relative standard error of a count is 1.04 / sqrt(2**12), about 1.6%.
+HLL_PRECISION = 12
+# The sales of a key are overestimated by at most e / CMS_WIDTH of total sales, with probability 1 - exp(-CMS_DEPTH), about 98%.
+CMS_WIDTH = 2**12
+CMS_DEPTH = 4
+# Keys kept by each space-saving summary.  A key outside the summary has fewer sales than the smallest key in it.
+TOP_CAPACITY = 1000
+TOP_N = 25
+# Odd 64 bit constants, one per row of the count-min table, to derive the row's hash from the key's.
+CMS_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9], dtype=np.uint64)
+
+
+## HASHING
+
+def hash_values(values):
+    """Returns a 64 bit hash of every value.  The hash does not depend on the process, so sketches built by different workers merge."""
+    return pd.util.hash_pandas_object(pd.Series(values, dtype=object), index=False).to_numpy()
+
+
+## HYPERLOGLOG
+
+def hll_registers(hashes, precision=HLL_PRECISION):
+    """Returns the register and the rank of every hash: the first precision bits pick the register, the rank is the position of the first 1 in the next 32 bits."""
+    registers = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    rest = ((hashes >> np.uint64(32 - precision)) & np.uint64(0xFFFFFFFF)).astype('float64')
+    with np.errstate(divide='ignore'):
+        ranks = np.where(rest > 0, 32 - np.floor(np.log2(rest)), 33).astype(np.uint8)
+    return registers, ranks
+
+
+def hll_estimate(registers):
+    """Returns the number of distinct values counted by a HyperLogLog's registers."""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.ldexp(1.0, -registers.astype(np.int64)).sum()
+    zeros = np.count_nonzero(registers == 0)
+    # Few values leave registers empty; counting them is more accurate there.
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * math.log(m / zeros)
+    return estimate
+
+
+def hll_error(precision=HLL_PRECISION):
+    """Returns the relative standard error of a HyperLogLog count."""
+    return 1.04 / math.sqrt(2**precision)
+
+
+## COUNT-MIN
+
+def cms_columns(hashes, width=CMS_WIDTH, depth=CMS_DEPTH):
+    """Returns the (depth, len(hashes)) column of every hash in every row of a count-min table; width is a power of two."""
+    shift = np.uint64(64 - int(width).bit_length() + 1)
+    return np.stack([(hashes * multiplier) >> shift for multiplier in CMS_MULTIPLIERS[:depth]]).astype(np.int64)
+
+
+def cms_estimate(table, hashes):
+    """Returns the estimated total of every hashed key: the smallest of its cells, which is never below the true total."""
+    columns = cms_columns(hashes, table.shape[1], table.shape[0])
+    return np.take_along_axis(table, columns, axis=1).min(axis=0)
+
+
+## SPACE-SAVING
+
+def new_summary():
+    """Returns an empty space-saving summary: the kept keys' counts and errors, and the floor, the most any key not kept can have."""
+    return {'counts': pd.Series(dtype='float64'), 'errors': pd.Series(dtype='float64'), 'floor': 0.0}
+
+
+def merge_summaries(left, right, capacity=TOP_CAPACITY):
+    """Returns the summary of the keys in two summaries, keeping the capacity keys with the largest counts.
+
+    A key missing from one side may have up to that side's floor there, so it is counted with the floor, which is also added to its error.  Every kept key's true total is between count - error and count.
+    """
+    keys = left['counts'].index.union(right['counts'].index)
+    counts = left['counts'].reindex(keys, fill_value=left['floor']) + right['counts'].reindex(keys, fill_value=right['floor'])
+    errors = left['errors'].reindex(keys, fill_value=left['floor']) + right['errors'].reindex(keys, fill_value=right['floor'])
+    floor = left['floor'] + right['floor']
+    if len(keys) > capacity:
+        order = np.argsort(-counts.to_numpy(), kind='stable')
+        floor = max(floor, float(counts.iloc[order[capacity]]))
+        counts, errors = counts.iloc[order[:capacity]], errors.iloc[order[:capacity]]
+    return {'counts': counts, 'errors': errors, 'floor': floor}
+
+
+## SKETCHES
+
+def new_sketches(precision=HLL_PRECISION, width=CMS_WIDTH, depth=CMS_DEPTH, capacity=TOP_CAPACITY):
+    """Returns empty sketches to pass to sketch_chunk.  Raises ValueError for a count-min table deeper than there are row hashes or a width that is not a power of two."""
+    if not 1 <= depth <= len(CMS_MULTIPLIERS):
+        raise ValueError(f"The count-min depth must be between 1 and {len(CMS_MULTIPLIERS)}, not {depth}")
+    if width < 2 or width & (width - 1):
+        raise ValueError(f"The count-min width must be a power of two, not {width}")
+    return {
+        'precision': precision,
+        'capacity': capacity,
+        'records': 0,
+        'sales': 0.0,
+        'records_by': {column: {} for column in DISTINCT_COLUMNS},
+        'titles': np.zeros(2**precision, dtype=np.uint8),
+        'titles_by': {column: {} for column in DISTINCT_COLUMNS},
+        'count_min': {column: np.zeros((depth, width), dtype='float64') for column in HEAVY_HITTER_COLUMNS},
+        'top': {column: new_summary() for column in HEAVY_HITTER_COLUMNS},
+    }
+
+
+def sketch_chunk(sketches, chunk):
+    """Adds one chunk of records to the sketches and returns them.  Records with a null value are left out of that value's counts."""
+    sales = chunk[SALES_COLUMN].to_numpy(dtype='float64')
+    sketches['records'] += len(chunk)
+    sketches['sales'] += float(sales.sum())
+
+    names = chunk['Name'].notna().to_numpy()
+    registers, ranks = hll_registers(hash_values(chunk['Name'].to_numpy()[names]), sketches['precision'])
+    np.maximum.at(sketches['titles'], registers, ranks)
+    for column in DISTINCT_COLUMNS:
+        codes, values = pd.factorize(chunk[column])
+        for value, records in zip(values.tolist(), np.bincount(codes[codes >= 0], minlength=len(values)).tolist()):
+            sketches['records_by'][column][value] = sketches['records_by'][column].get(value, 0) + records
+        # One block of registers per value of the chunk, filled at once and merged into the kept ones.
+        title_codes = codes[names]
+        present = title_codes >= 0
+        chunk_registers = np.zeros((len(values), len(sketches['titles'])), dtype=np.uint8)
+        np.maximum.at(chunk_registers, (title_codes[present], registers[present]), ranks[present])
+        for value, value_registers in zip(values.tolist(), chunk_registers):
+            kept = sketches['titles_by'][column].get(value)
+            sketches['titles_by'][column][value] = value_registers if kept is None else np.maximum(kept, value_registers)
+
+    for column in HEAVY_HITTER_COLUMNS:
+        # The chunk is grouped first: its totals are exact, and each key is hashed and merged once.
+        totals = pd.Series(sales, index=chunk[column].to_numpy()).groupby(level=0, sort=False).sum()
+        table = sketches['count_min'][column]
+        columns = cms_columns(hash_values(totals.index.to_numpy()), table.shape[1], table.shape[0])
+        for row in range(table.shape[0]):
+            table[row] += np.bincount(columns[row], weights=totals.to_numpy(), minlength=table.shape[1])
+        exact = {'counts': totals, 'errors': pd.Series(0.0, index=totals.index), 'floor': 0.0}
+        sketches['top'][column] = merge_summaries(sketches['top'][column], exact, sketches['capacity'])
+    return sketches
+
+
+def merge_sketches(left, right):
+    """Returns the sketches of the records of both left and right, e.g. of two workers' files.  Neither is changed."""
+    if (left['precision'], left['capacity']) != (right['precision'], right['capacity']) or any(left['count_min'][column].shape != right['count_min'][column].shape for column in HEAVY_HITTER_COLUMNS):
+        raise ValueError('Sketches built with different sizes cannot be merged')
+    depth, width = left['count_min'][HEAVY_HITTER_COLUMNS[0]].shape
+    merged = new_sketches(left['precision'], width, depth, left['capacity'])
+    merged['records'] = left['records'] + right['records']
+    merged['sales'] = left['sales'] + right['sales']
+    merged['titles'] = np.maximum(left['titles'], right['titles'])
+    for column in DISTINCT_COLUMNS:
+        for value in left['records_by'][column].keys() | right['records_by'][column].keys():
+            merged['records_by'][column][value] = left['records_by'][column].get(value, 0) + right['records_by'][column].get(value, 0)
+        for value in left['titles_by'][column].keys() | right['titles_by'][column].keys():
+            sides = [side['titles_by'][column][value] for side in (left, right) if value in side['titles_by'][column]]
+            merged['titles_by'][column][value] = np.maximum.reduce(sides)
+    for column in HEAVY_HITTER_COLUMNS:
+        merged['count_min'][column] = left['count_min'][column] + right['count_min'][column]
+        merged['top'][column] = merge_summaries(left['top'][column], right['top'][column], left['capacity'])
+    return merged
+
+
+def sketch_games(chunks, **sizes):
+    """Returns the sketches of every record in an iterable of dataframes."""
+    sketches = new_sketches(**sizes)
+    for chunk in chunks:
+        sketch_chunk(sketches, chunk)
+    return sketches
+
+
+def sketch_files(path, files, batch_size=100_000, **sizes):
+    """Returns the sketches of some of the files of the dataset at path, read one batch at a time."""
+    dataset = ds.dataset(files, format='parquet', partitioning=PARTITIONING, partition_base_dir=path)
+    return sketch_games((batch.to_pandas() for batch in dataset.to_batches(columns=SKETCH_COLUMNS, batch_size=batch_size)), **sizes)
+
+
+def sketch_dataset(path=DATASET_PATH, workers=1, batch_size=100_000, **sizes):
+    """Returns the sketches of the dataset at path.  With several workers, each sketches its share of the files and the sketches are merged."""
+    if workers <= 1:
+        return sketch_games(iter_games(path, columns=SKETCH_COLUMNS, batch_size=batch_size), **sizes)
+    files = sorted(ds.dataset(path, format='parquet', partitioning=PARTITIONING).files)
+    shares = [files[worker::workers] for worker in range(workers) if files[worker::workers]]
+    with ProcessPoolExecutor(max_workers=len(shares)) as executor:
+        futures = [executor.submit(sketch_files, path, share, batch_size, **sizes) for share in shares]
+        parts = [future.result() for future in futures]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged = merge_sketches(merged, part)
+    return merged
+
+
+## ESTIMATES
+
+def distinct_titles(sketches, column):
+    """Returns the records and the estimated distinct titles of every value of column (year or Platform), with the standard error of the estimate, most records first."""
+    registers = sketches['titles_by'][column]
+    counts = pd.DataFrame({
+        column: list(registers),
+        'count': [sketches['records_by'][column][value] for value in registers],
+        'titles': [round(hll_estimate(value_registers)) for value_registers in registers.values()],
+    })
+    counts['titles_error'] = (counts['titles'] * hll_error(sketches['precision'])).round(1)
+    return counts.sort_values(['count', column], ascending=[False, True], ignore_index=True)
+
+
+def top_sellers(sketches, column='Name', n=TOP_N):
+    """Returns the n keys of column (Name or Publisher) with the most estimated sales, largest first.
+
+    Sales are between Global_Sales_low and Global_Sales.  A key is guaranteed to be in the true top n when its low bound is above the sales any key outside the list can have.
+    """
+    summary = sketches['top'][column]
+    keys = summary['counts'].index.to_numpy()
+    low = summary['counts'].to_numpy() - summary['errors'].to_numpy()
+    # Both the summary's count and the count-min estimate are at least the true sales, so the smaller one is the tighter estimate.
+    counts = np.minimum(summary['counts'].to_numpy(), cms_estimate(sketches['count_min'][column], hash_values(keys)))
+    order = np.argsort(-counts, kind='stable')
+    outside = max(summary['floor'], counts[order[n]] if len(counts) > n else 0.0)
+    top = pd.DataFrame({column: keys[order[:n]], SALES_COLUMN: counts[order[:n]], f'{SALES_COLUMN}_low': low[order[:n]]})
+    top['guaranteed'] = top[f'{SALES_COLUMN}_low'] >= outside
+    return top
+
+
+def sales_estimates(sketches, column, keys):
+    """Returns the count-min estimate of the sales of every key of column, which is never below its true sales."""
+    keys = pd.Series(keys, dtype=object)
+    return pd.Series(cms_estimate(sketches['count_min'][column], hash_values(keys.to_numpy())), index=keys, name=SALES_COLUMN)
+
+
+def error_bounds(sketches):
+    """Returns the error bound of every estimate, in its own units."""
+    depth, width = sketches['count_min'][HEAVY_HITTER_COLUMNS[0]].shape
+    return {
+        'distinct_titles_relative_error': hll_error(sketches['precision']),
+        'count_min_sales_error': math.e / width * sketches['sales'],
+        'count_min_probability': 1 - math.exp(-depth),
+        **{f'top_{column}_sales_error': float(sketches['top'][column]['errors'].max()) if len(sketches['top'][column]['errors']) else 0.0 for column in HEAVY_HITTER_COLUMNS},
+    }
+
+
+def approximate_frames(sketches, n=TOP_N):
+    """Returns the tables the charts read, estimated from the sketches, in the shapes of the exact ones."""
+    top = top_sellers(sketches, 'Name', n)
+    return {
+        'game_count_by_year': distinct_titles(sketches, 'year'),
+        'titles_by_platform': distinct_titles(sketches, 'Platform'),
+        'top_sellers_world': top.sort_values(SALES_COLUMN, ascending=True, kind='stable').reset_index(),
+        'publisher_ranking': top_sellers(sketches, 'Publisher', n),
+        'total_titles': round(hll_estimate(sketches['titles'])),
+    }
+
+
+def exact_frames(games, n=TOP_N):
+    """Returns the tables the charts read, computed exactly from the records."""
+    frames = {}
+    for column, name in [('year', 'game_count_by_year'), ('Platform', 'titles_by_platform')]:
+        counts = games.groupby(column, observed=True).agg(count=('Name', 'size'), titles=('Name', 'nunique')).reset_index()
+        frames[name] = counts.sort_values(['count', column], ascending=[False, True], ignore_index=True)
+    titles = games.groupby('Name')[SALES_COLUMN].sum()
+    top = titles.nlargest(n).rename_axis('Name').reset_index()
+    frames['top_sellers_world'] = top.sort_values(SALES_COLUMN, ascending=True, kind='stable').reset_index()
+    frames['publisher_ranking'] = games.groupby('Publisher', observed=True)[SALES_COLUMN].sum().nlargest(n).reset_index()
+    frames['total_titles'] = games['Name'].nunique()
+    return frames
+
+
+def compare_frames(approximate, exact):
+    """Returns the observed error of every estimate against the exact tables."""
+    errors = {'total_titles_relative_error': abs(approximate['total_titles'] - exact['total_titles']) / max(exact['total_titles'], 1)}
+    for name, column in [('game_count_by_year', 'year'), ('titles_by_platform', 'Platform')]:
+        joined = approximate[name].merge(exact[name], on=column, suffixes=('', '_exact'))
+        errors[f'{name}_max_relative_error'] = float((joined['titles'] - joined['titles_exact']).abs().div(joined['titles_exact']).max())
+        errors[f'{name}_records_match'] = bool((joined['count'] == joined['count_exact']).all())
+    for name, column in [('top_sellers_world', 'Name'), ('publisher_ranking', 'Publisher')]:
+        joined = approximate[name].merge(exact[name], on=column, how='left', suffixes=('', '_exact'))
+        errors[f'{name}_overlap'] = f"{joined[f'{SALES_COLUMN}_exact'].notna().sum()}/{len(exact[name])}"
+        errors[f'{name}_max_sales_error'] = float((joined[SALES_COLUMN] - joined[f'{SALES_COLUMN}_exact']).abs().max())
+    return errors
+
+
+def chart_artifacts(frames):
+    """Returns the charts that can be drawn from the tables as (name, builder, args) artifacts."""
+    from video_game_sales_i.clean_report import games_by_year_chart
+    from video_game_sales_ii.viz_report import top_games_chart
+    return [
+        ('games_by_year_chart', games_by_year_chart, (frames['game_count_by_year'][['year', 'count']],)),
+        ('top_games_chart', top_games_chart, (frames['top_sellers_world'][['Name', SALES_COLUMN]],)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count the titles and rank the best sellers of the cleaned dataset, exactly or from sketches built one batch at a time.')
+    parser.add_argument('path', nargs='?', default=DATASET_PATH, help='Parquet dataset written by the cleaning script')
+    parser.add_argument('--approximate', action='store_true', help='estimate from sketches instead of grouping every record')
+    parser.add_argument('--compare', action='store_true', help='with --approximate, also compute the exact tables and report the observed errors')
+    parser.add_argument('--batch-size', type=int, default=100_000, help='records read at a time')
+    parser.add_argument('--workers', type=int, default=1, help='processes sketching the dataset files')
+    parser.add_argument('--top', type=int, default=TOP_N, help='number of titles and publishers to rank')
+    parser.add_argument('--render-dir', help='draw the records by year and top titles charts to this folder')
+    args = parser.parse_args()
+
+    if args.approximate:
+        sketches = sketch_dataset(args.path, args.workers, args.batch_size)
+        frames = approximate_frames(sketches, args.top)
+        print(f"Records: {sketches['records']:,}, titles: about {frames['total_titles']:,}")
+        print('Error bounds: ' + ', '.join(f'{key}: {value:.4g}' for key, value in error_bounds(sketches).items()))
+    else:
+        frames = exact_frames(read_games(args.path, columns=SKETCH_COLUMNS), args.top)
+        print(f"Titles: {frames['total_titles']:,}")
+    for name in ['game_count_by_year', 'titles_by_platform', 'publisher_ranking']:
+        print(frames[name].to_string(index=False))
+    print(frames['top_sellers_world'].iloc[::-1].drop(columns='index').to_string(index=False))
+    if args.approximate and args.compare:
+        exact = exact_frames(read_games(args.path, columns=SKETCH_COLUMNS), args.top)
+        print('Observed errors: ' + ', '.join(f'{key}: {value:.4g}' if isinstance(value, float) else f'{key}: {value}' for key, value in compare_frames(frames, exact).items()))
+    if args.render_dir:
+        from video_game_sales_i.render import render_artifacts
+        drawn = render_artifacts(chart_artifacts(frames), args.render_dir)
+        print(f"Drew {', '.join(drawn) or 'nothing new'} in {args.render_dir}")
+
+
+if __name__ == '__main__':
+    main()
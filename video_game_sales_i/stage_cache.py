@@ -0,0 +1,63 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+
+# Bump this to throw away every checkpoint written by an older version of the pipeline.
+CACHE_VERSION = 1
+
+
+def file_digest(path, block_size=1 << 20):
+    """Returns the sha256 hex digest of a file's contents, read in blocks so large files are not loaded into memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_key(stage_name, func, params, upstream_keys, dependencies=()):
+    """Returns a hash identifying one run of a stage.
+
+    The key covers the stage's own source code, the source of the helper modules it calls (dependencies), its parameters, and the keys of the stages (or input files) it reads from, so changing anything upstream changes every key downstream of it.
+    """
+    payload = {
+        'version': CACHE_VERSION,
+        'stage': stage_name,
+        'source': inspect.getsource(func),
+        'dependencies': {module.__name__: inspect.getsource(module) for module in dependencies},
+        'params': params,
+        'upstream': list(upstream_keys),
+    }
+    # default=str lets parameters such as paths or tuples be hashed by their text.
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def checkpoint_path(cache_dir, stage_name, key):
+    """Returns the file a stage's outputs are stored in for a given key."""
+    return os.path.join(cache_dir, f'{stage_name}-{key[:16]}.pickle')
+
+
+def read_checkpoint(cache_dir, stage_name, key):
+    """Returns the cached outputs of a stage, or None if this stage has not been run with this key."""
+    path = checkpoint_path(cache_dir, stage_name, key)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+def write_checkpoint(cache_dir, stage_name, key, outputs):
+    """Stores a stage's outputs and removes older checkpoints of the same stage."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = checkpoint_path(cache_dir, stage_name, key)
+    # Write to a temporary file first so an interrupted run never leaves a half written checkpoint behind.
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(outputs, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    for old in os.listdir(cache_dir):
+        if old.startswith(stage_name + '-') and old.endswith('.pickle') and os.path.join(cache_dir, old) != path:
+            os.remove(os.path.join(cache_dir, old))
@@ -0,0 +1,137 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Generates files shaped like vgsales.csv, of any size, for benchmarking.  Platforms, genres, publishers, release years and title words are drawn from the frequencies in the real file.
+# Run from the repository root: python -m video_game_sales_i.synthetic_vgsales 1000000 vgsales_1m.csv
+filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vgsales.csv')
+COLUMNS = ['Rank', 'Name', 'Platform', 'Year', 'Genre', 'Publisher', 'NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Global_Sales']
+REGIONS = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales']
+
+# Rates measured on vgsales.csv, as a fraction of records (or of titles, where noted).
+RATES = {
+    'missing_year': 0.0088,       # Year is missing but Publisher is not.
+    'missing_publisher': 0.0082,  # Publisher is missing but Year is not.
+    'missing_both': 0.0075,
+    'year_in_title': 0.081,       # of titles: a two- or four-digit year is part of the name (FIFA 15, Madden NFL 2004).
+    'sequel': 0.10,               # of titles: a sequel number is part of the name.
+    'other_year': 0.06,           # of titles: one platform was released a year later.
+    'other_publisher': 0.029,     # of titles: one platform has a different publisher.
+    'exact_duplicate': 0.0001,    # the record appears twice.
+    'sales_duplicate': 0.0001,    # the record appears twice with different sales numbers.
+    'discrepancy': 0.27,          # Global_Sales is off from the sum of the regional sales by a rounding step.
+}
+# Number of platforms a title was released on, as counted in vgsales.csv (one platform: 8,719 titles, two: 1,501, ...).
+PLATFORMS_PER_TITLE = [8719, 1501, 711, 282, 143, 87, 32, 13, 5]
+# Share of records with no sales in each region, and the mean and standard deviation of the log of the sales where there are some.
+REGION_SALES = {'NA_Sales': (0.27, -1.92, 1.31), 'EU_Sales': (0.35, -2.59, 1.41), 'JP_Sales': (0.63, -2.57, 1.35), 'Other_Sales': (0.39, -3.44, 1.16)}
+
+
+def frequencies(values):
+    """Returns the distinct values of a column and how often each one appears."""
+    counts = values.value_counts(normalize=True)
+    return counts.index.to_numpy(), counts.to_numpy()
+
+
+def title_names(rng, n_titles, words):
+    """Returns n_titles made-up game titles of two or three words from the real titles, some with a sequel number or a year."""
+    n_words = rng.integers(2, 4, n_titles)
+    names = pd.Series(words[rng.integers(0, len(words), n_titles)]) + ' ' + words[rng.integers(0, len(words), n_titles)]
+    third = n_words == 3
+    names[third] = names[third] + ' ' + words[rng.integers(0, len(words), third.sum())]
+    sequel = rng.random(n_titles) < RATES['sequel']
+    names[sequel] = names[sequel] + ' ' + rng.integers(2, 10, sequel.sum()).astype(str)
+    return names
+
+
+def generate_vgsales(n_rows, seed=0, source=filename):
+    """Returns a dataframe of n_rows records in the layout of vgsales.csv, with the missing values, years in titles, duplicates and multi-platform titles of the real file."""
+    rng = np.random.default_rng(seed)
+    real = pd.read_csv(source, dtype={'Year': 'str'}, na_values={'Unknown', 'unknown', 'UNKNOWN', 'NaN', 'nan', 'NAN'})
+    platforms, platform_p = frequencies(real['Platform'])
+    genres, genre_p = frequencies(real['Genre'])
+    publishers, publisher_p = frequencies(real['Publisher'].dropna())
+    years, year_p = frequencies(real['Year'].dropna().astype(int))
+    # Words of the real titles, without the numbers, so years and sequels only come from the rates above.
+    words = real['Name'].str.split().explode().dropna()
+    words = words[~words.str.isdigit()].unique()
+
+    # Some records are repeated at the end; draw how many first.
+    n_exact, n_different = rng.binomial(n_rows, [RATES['exact_duplicate'], RATES['sales_duplicate']])
+    n_base = n_rows - n_exact - n_different
+
+    # Draw titles, each on several platforms, until there are enough records.
+    per_title = np.array(PLATFORMS_PER_TITLE) / sum(PLATFORMS_PER_TITLE)
+    n_titles = int(n_base / (per_title * np.arange(1, len(per_title) + 1)).sum() * 1.05) + 10
+    title_platforms = rng.choice(np.arange(1, len(per_title) + 1), n_titles, p=per_title)
+    title_year = rng.choice(years, n_titles, p=year_p)
+    names = title_names(rng, n_titles, words)
+    # Sports titles are named for the season after their release: Madden NFL 07 came out in 2006.
+    in_title = rng.random(n_titles) < RATES['year_in_title']
+    two_digit = in_title & (rng.random(n_titles) < 0.5)
+    four_digit = in_title & ~two_digit
+    names[two_digit] = names[two_digit] + ' ' + pd.Series((title_year[two_digit] + 1) % 100).map('{:02d}'.format).to_numpy()
+    names[four_digit] = names[four_digit] + ' ' + title_year[four_digit].astype(str)
+
+    # One record per title and platform.  Consecutive platforms from a random start never repeat within a title.
+    title = np.repeat(np.arange(n_titles), title_platforms)[:n_base]
+    platform_number = np.arange(len(title)) - np.repeat(np.cumsum(title_platforms) - title_platforms, title_platforms)[:n_base]
+    start = rng.integers(0, len(platforms), n_titles)
+    games = pd.DataFrame({
+        'Name': names.to_numpy()[title],
+        'Platform': platforms[(start[title] + platform_number) % len(platforms)],
+        'Year': title_year[title],
+        'Genre': rng.choice(genres, n_titles, p=genre_p)[title],
+        'Publisher': rng.choice(publishers, n_titles, p=publisher_p)[title],
+    })
+    # Some titles came out a year later, or from another publisher, on their last platform.
+    last_platform = platform_number == title_platforms[title] - 1
+    multi = title_platforms[title] > 1
+    later = last_platform & multi & (rng.random(n_titles) < RATES['other_year'])[title]
+    games.loc[later, 'Year'] += 1
+    other = last_platform & multi & (rng.random(n_titles) < RATES['other_publisher'])[title]
+    games.loc[other, 'Publisher'] = rng.choice(publishers, other.sum(), p=publisher_p)
+
+    # Sales in millions, rounded to 10,000 like the real file.
+    for region, (share_zero, log_mean, log_std) in REGION_SALES.items():
+        sales = np.round(np.exp(rng.normal(log_mean, log_std, len(games))), 2)
+        games[region] = np.where(rng.random(len(games)) < share_zero, 0.0, sales)
+    games['Global_Sales'] = games[REGIONS].sum(axis=1).round(2)
+    off = rng.random(len(games)) < RATES['discrepancy']
+    games.loc[off, 'Global_Sales'] = (games.loc[off, 'Global_Sales'] + rng.choice([-0.01, 0.01], off.sum())).clip(lower=0.01).round(2)
+
+    # Missing values are written as they are in the real file.
+    games['Year'] = games['Year'].astype(str)
+    draw = rng.random(len(games))
+    missing_year = draw < RATES['missing_year'] + RATES['missing_both']
+    missing_publisher = (draw >= RATES['missing_year']) & (draw < RATES['missing_year'] + RATES['missing_both'] + RATES['missing_publisher'])
+    games.loc[missing_year, 'Year'] = 'N/A'
+    games.loc[missing_publisher, 'Publisher'] = 'Unknown'
+
+    # Repeat a few records exactly, and a few with different sales numbers.
+    exact = games.iloc[rng.integers(0, n_base, n_exact)]
+    different = games.iloc[rng.integers(0, n_base, n_different)].copy()
+    different[REGIONS] = (different[REGIONS] * 0.1).round(2)
+    different['Global_Sales'] = different[REGIONS].sum(axis=1).round(2)
+    games = pd.concat([games, exact, different], ignore_index=True)
+
+    # The real file is ranked by global sales.
+    games = games.sort_values('Global_Sales', ascending=False, kind='stable').reset_index(drop=True)
+    games.insert(0, 'Rank', np.arange(1, len(games) + 1))
+    return games[COLUMNS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic .csv shaped like vgsales.csv.')
+    parser.add_argument('rows', type=int, help='number of records')
+    parser.add_argument('output', help='path of the .csv to write')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate_vgsales(args.rows, seed=args.seed).to_csv(args.output, index=False)
+    print(f"Wrote {args.rows:,} records to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+import argparse
+import re
+
+import numpy as np
+import pandas as pd
+
+from video_game_sales_i.dedup import combine_hashes
+from video_game_sales_i.games_store import DATASET_PATH, read_games
+
+# Finds game titles that are near duplicates of each other: punctuation variants ('Hot Wheels: World Race' and 'Hot Wheels World Race'), notes in parentheses ('Bomberman (jp sales)', 'Tomb Raider (2013)') and spelling variants.
+# Comparing every pair of titles is out of the question for a large catalog, so titles are blocked first.  Each title gets a MinHash signature of its character n-grams and the signature is cut into bands; only titles sharing a band are compared.  Titles with n-gram (Jaccard) similarity s share at least one band with probability 1 - (1 - s**BAND_ROWS)**BANDS, about 0.99 for s = 0.8 and 0.02 for s = 0.2.
+# The candidate pairs are scored by their exact n-gram similarity, and pairs above a threshold are joined into clusters.  Titles whose numbers differ ('FIFA 14' and 'FIFA 15', 'Doom' and 'Doom (2016)') are scored but not clustered by default, as they are usually different games.
+# Run from the repository root: python -m video_game_sales_i.title_matching --min-score 0.7
+NGRAM = 3
+BANDS = 10
+BAND_ROWS = 3
+# Blocks with more titles than this are skipped rather than compared pair by pair; they are titles sharing a very common band, not near duplicates.
+MAX_BLOCK_SIZE = 200
+MIN_SCORE = 0.7
+# Clusters only join titles this similar, so a chain of looser matches ('Super Robot Taisen A', 'Super Robot Taisen D', ...) does not become one cluster.
+CLUSTER_SCORE = 0.9
+# Mersenne prime modulus of the MinHash functions.
+HASH_PRIME = np.int64(2**31 - 1)
+SEED = 0
+
+
+def normalize_title(title):
+    """Returns a title in lower case, without punctuation and without notes in parentheses such as '(jp sales)' or '(2013)'."""
+    title = re.sub(r'\([^)]*\)', ' ', title.lower())
+    return ' '.join(re.findall(r'[^\W_]+', title))
+
+
+def title_ngrams(normalized):
+    """Returns the set of character n-grams of a normalized title, padded so the first and last letters count as much as the others."""
+    padded = f' {normalized} '
+    return {padded[start:start + NGRAM] for start in range(max(len(padded) - NGRAM + 1, 1))}
+
+
+def title_numbers(title):
+    """Returns the numbers of a title, including roman numerals and years in parentheses."""
+    return frozenset(word for word in re.findall(r'[^\W_]+', title.lower()) if word.isdigit() or re.fullmatch(r'[ivx]+', word))
+
+
+def minhash_signatures(ngram_sets, n_hashes=BANDS * BAND_ROWS, seed=SEED):
+    """Returns the (n_hashes, titles) MinHash signatures of a list of n-gram sets, computed for every n-gram of every title at once."""
+    lengths = np.array([len(ngrams) for ngrams in ngram_sets])
+    ngram_ids, _ = pd.factorize(np.array([ngram for ngrams in ngram_sets for ngram in ngrams], dtype=object))
+    starts = np.r_[0, np.cumsum(lengths)[:-1]]
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, HASH_PRIME, n_hashes, dtype=np.int64)
+    b = rng.integers(0, HASH_PRIME, n_hashes, dtype=np.int64)
+    signatures = np.empty((n_hashes, len(ngram_sets)), dtype=np.int64)
+    for row in range(n_hashes):
+        # Every n-gram id is below 2**20 or so and a below 2**31, so the product fits in 64 bits.
+        hashed = (a[row] * ngram_ids + b[row]) % HASH_PRIME
+        signatures[row] = np.minimum.reduceat(hashed, starts)
+    return signatures
+
+
+def candidate_pairs(signatures, bands=BANDS, band_rows=BAND_ROWS, max_block_size=MAX_BLOCK_SIZE):
+    """Returns the (i, j) pairs, i < j, of titles that share at least one band of their signatures, and the number of blocks skipped for being too large."""
+    pairs, skipped = [], 0
+    for band in range(bands):
+        rows = signatures[band * band_rows:(band + 1) * band_rows]
+        keys = combine_hashes([row.astype(np.uint64) for row in rows])
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(keys)])
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            if size > max_block_size:
+                skipped += 1
+                continue
+            block = np.sort(order[start:start + size])
+            first, second = np.triu_indices(size, k=1)
+            pairs.append(np.stack([block[first], block[second]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64), skipped
+    return np.unique(np.concatenate(pairs), axis=0), skipped
+
+
+def match_titles(names, min_score=MIN_SCORE):
+    """Returns the scored pairs of near duplicate titles among names, and blocking statistics.
+
+    Every pair of distinct titles with the same normalized title scores 1; other pairs are compared only if they share a block, and kept if their n-gram similarity is at least min_score.
+    """
+    titles = pd.Series(pd.unique(pd.Series(names).dropna()), dtype=object)
+    normalized = titles.map(normalize_title)
+    codes, uniques = pd.factorize(normalized)
+    ngram_sets = [title_ngrams(title) for title in uniques]
+
+    pairs, skipped = candidate_pairs(minhash_signatures(ngram_sets)) if len(uniques) > 1 else (np.empty((0, 2), dtype=np.int64), 0)
+    scores = np.array([len(ngram_sets[i] & ngram_sets[j]) / len(ngram_sets[i] | ngram_sets[j]) for i, j in pairs])
+    keep = scores >= min_score if len(pairs) else np.zeros(0, dtype=bool)
+    normalized_matches = pd.DataFrame({'left': pairs[keep, 0], 'right': pairs[keep, 1], 'score': scores[keep]})
+    # Titles sharing a normalized title are each other's matches too.
+    same = pd.DataFrame({'left': np.arange(len(uniques)), 'right': np.arange(len(uniques)), 'score': 1.0})
+    normalized_matches = pd.concat([same, normalized_matches], ignore_index=True)
+
+    # Back from normalized titles to every title with that normalized form.
+    members = pd.DataFrame({'code': codes, 'Name': titles.to_numpy()})
+    matches = normalized_matches.merge(members.rename(columns={'code': 'left', 'Name': 'Name_left'}), on='left').merge(members.rename(columns={'code': 'right', 'Name': 'Name_right'}), on='right')
+    matches = matches[matches['Name_left'] != matches['Name_right']]
+    # Titles with the same normalized form can still differ in a year note, e.g. 'Doom' and 'Doom (2016)'.
+    matches['numbers_differ'] = [title_numbers(left) != title_numbers(right) for left, right in zip(matches['Name_left'], matches['Name_right'])]
+    # Each pair once, in alphabetical order.
+    swap = matches['Name_left'] > matches['Name_right']
+    matches.loc[swap, ['Name_left', 'Name_right']] = matches.loc[swap, ['Name_right', 'Name_left']].to_numpy()
+    matches = matches.drop_duplicates(['Name_left', 'Name_right'])
+    matches = matches[['Name_left', 'Name_right', 'score', 'numbers_differ']].sort_values(['score', 'Name_left', 'Name_right'], ascending=[False, True, True]).reset_index(drop=True)
+    stats = {'titles': len(titles), 'normalized_titles': len(uniques), 'all_pairs': len(uniques) * (len(uniques) - 1) // 2, 'candidate_pairs': len(pairs), 'skipped_blocks': skipped, 'matches': len(matches)}
+    return matches, stats
+
+
+def title_clusters(matches, counts=None, min_score=CLUSTER_SCORE, allow_number_changes=False):
+    """Returns one row per clustered title with its cluster and the cluster's canonical title: the one with the most records in counts (a Series of records per title), then the shortest.
+
+    Only pairs scoring at least min_score are joined, and pairs whose numbers differ are left out unless allow_number_changes.
+    """
+    links = matches[matches['score'] >= min_score]
+    if not allow_number_changes:
+        links = links[~links['numbers_differ']]
+    names = pd.unique(pd.concat([links['Name_left'], links['Name_right']], ignore_index=True))
+    position = {name: i for i, name in enumerate(names)}
+    # Union-find over the linked titles.
+    parent = np.arange(len(names))
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    for left, right in zip(links['Name_left'], links['Name_right']):
+        parent[root(position[left])] = root(position[right])
+    clusters = pd.DataFrame({'Name': names, 'cluster': [root(i) for i in range(len(names))]})
+    clusters['records'] = clusters['Name'].map(counts).fillna(0).astype(int) if counts is not None else 0
+    clusters['length'] = clusters['Name'].str.len()
+    ranked = clusters.sort_values(['cluster', 'records', 'length', 'Name'], ascending=[True, False, True, True])
+    clusters['canonical'] = clusters['cluster'].map(ranked.drop_duplicates('cluster').set_index('cluster')['Name'])
+    clusters['cluster'] = pd.factorize(clusters['canonical'], sort=True)[0]
+    return clusters.drop(columns='length').sort_values(['canonical', 'Name']).reset_index(drop=True)
+
+
+def canonical_names(names, clusters):
+    """Returns names with every clustered title replaced by its canonical title, e.g. to join records on Name in the year and publisher fixes or to group them into series."""
+    return names.map(clusters.set_index('Name')['canonical']).fillna(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find near duplicate game titles in the cleaned dataset.')
+    parser.add_argument('path', nargs='?', default=DATASET_PATH, help='Parquet dataset written by the cleaning script')
+    parser.add_argument('--min-score', type=float, default=MIN_SCORE, help='lowest n-gram similarity of a match')
+    parser.add_argument('--cluster-score', type=float, default=CLUSTER_SCORE, help='lowest similarity of titles joined into a cluster')
+    parser.add_argument('--allow-number-changes', action='store_true', help="cluster titles whose numbers differ, e.g. 'FIFA 14' and 'FIFA 15'")
+    parser.add_argument('--output', help='write the clusters to this CSV file')
+    args = parser.parse_args()
+
+    names = read_games(args.path, columns=['Name'])['Name']
+    matches, stats = match_titles(names, args.min_score)
+    clusters = title_clusters(matches, names.value_counts(), args.cluster_score, args.allow_number_changes)
+    print(', '.join(f'{key}: {value:,}' for key, value in stats.items()))
+    print(matches.head(40).to_string(index=False))
+    print(f"{clusters['cluster'].nunique():,} clusters of {len(clusters):,} titles")
+    if args.output:
+        clusters.to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from video_game_sales_i.publisher_fix import key_codes
+
+# A "word" in the title that is exactly two or four digits long.  The title is split on single spaces in the original fix, so a word is bounded by a space or by the start/end of the title.
+# Ignore any instance of 64.  This is for Nintendo64 and refers to game platform, not the year.
+YEAR_IN_TITLE_PATTERN = r'(?:^| )(?!64(?: |$))(\d{4}|\d{2})(?= |$)'
+
+# Any two-digit date greater than 79 will apply to the years 1980-1999.  Any other two-digit date will apply to the years 2000-2020.
+TWO_DIGIT_YEAR_PIVOT = 79
+
+
+def extract_year_from_title(names):
+    """Returns a nullable integer Series of release years found within the game titles, aligned to the index of names.
+
+    Two-digit years are treated as the season the game was named for, so the release year is one year earlier (Madden NFL 07 was released in 2006).  Four-digit years are kept as is.  Titles without a year are left null.
+    """
+    # Pull the first two- or four-digit "word" out of every title in one pass.
+    words = names.str.extract(YEAR_IN_TITLE_PATTERN, expand=False)
+    digits = pd.to_numeric(words, errors='coerce').astype('Int16')
+    two_digit = words.str.len() == 2
+    century = (digits <= TWO_DIGIT_YEAR_PIVOT).astype('Int16') * 100 + 1900
+    years = digits.mask(two_digit, century + digits - 1)
+    return years.rename('Year')
+
+
+# How to choose a year when the same title and publisher was released in different years on different platforms (Hitman 2: Silent Assassin, PES 2009: Pro Evolution Soccer, Tomb Raider (2013)).
+# first: the year of the first record with a year, min: the earliest year, skip: leave the year null.
+CONFLICT_POLICIES = ['first', 'min', 'skip']
+
+
+def years_from_other_platforms(games_complete_year, games_missing_year, policy='first'):
+    """Returns the release years recaptured from the same title and publisher on other platforms, aligned to games_missing_year, and a dataframe of the records whose candidate years disagree.
+
+    An index from (Name, Publisher) to the known years and platforms is built only for the keys of the missing records, so memory is bounded by the missing records rather than by missing records times platforms.
+    A record whose own platform already has a year for this title and publisher stays null, as do records with a null Name or Publisher.
+    """
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"policy must be one of {CONFLICT_POLICIES}, not {policy!r}")
+    complete_keys, missing_keys = key_codes(games_complete_year, games_missing_year, ['Name', 'Publisher'])
+
+    # Only complete records sharing a key with a missing record are indexed.
+    relevant = np.flatnonzero((complete_keys >= 0) & np.isin(complete_keys, missing_keys[missing_keys >= 0]))
+    keys = complete_keys[relevant]
+    years = pd.to_numeric(games_complete_year['Year'].iloc[relevant]).to_numpy(dtype='float64')
+    n_keys = max(complete_keys.max(initial=-1), missing_keys.max(initial=-1)) + 2
+
+    # The record each policy takes its year from: the first one per key in the original order, or the earliest year per key.
+    if policy == 'min':
+        order = np.lexsort([years, keys])
+    else:
+        order = np.arange(len(keys))
+    first_of_key = order[~pd.Series(keys[order]).duplicated(keep='first').to_numpy()]
+    source = np.full(n_keys, -1, dtype='int64')
+    source[keys[first_of_key]] = relevant[first_of_key]
+
+    # Number of distinct years known for every key.
+    year_pairs = np.unique(np.stack([keys, years]), axis=1)
+    distinct_years = np.bincount(year_pairs[0].astype('int64'), minlength=n_keys)
+
+    # A record stays null if its own platform already has a year: it is not missing from another platform, it conflicts with it.
+    platform_codes = pd.factorize(pd.concat([games_complete_year['Platform'].iloc[relevant], games_missing_year['Platform']], ignore_index=True))[0]
+    known_platforms = pd.MultiIndex.from_arrays([keys, platform_codes[:len(relevant)]])
+    same_platform = pd.MultiIndex.from_arrays([missing_keys, platform_codes[len(relevant):]]).isin(known_platforms)
+
+    # Null keys land on the last slot, which never has a source record.
+    lookup = np.where(missing_keys >= 0, missing_keys, n_keys - 1)
+    chosen = source[lookup]
+    conflict = distinct_years[lookup] > 1
+    chosen[same_platform] = -1
+    if policy == 'skip':
+        chosen[conflict] = -1
+
+    # Copy the chosen years in their original type (text, or Int16 from the chunked reader).
+    recaptured = pd.Series(np.nan, index=games_missing_year.index, dtype=games_complete_year['Year'].dtype)
+    recaptured.iloc[np.flatnonzero(chosen >= 0)] = games_complete_year['Year'].iloc[chosen[chosen >= 0]].to_numpy()
+
+    # List the candidate years of every conflicting record alongside the year chosen for it.
+    conflicts = games_missing_year.loc[conflict & ~same_platform, ['Name', 'Publisher', 'Platform']]
+    candidate_years = pd.Series(year_pairs[1], index=year_pairs[0].astype('int64')).astype('int64').astype(str).groupby(level=0).agg(', '.join)
+    conflicts['candidate_years'] = candidate_years.reindex(missing_keys[conflict & ~same_platform]).to_numpy()
+    conflicts['Year'] = recaptured[conflict & ~same_platform].to_numpy()
+    return recaptured, conflicts
@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+from video_game_sales_i.games_store import read_games, subset_mask
+from video_game_sales_ii.regional_outliers import REGIONS, regional_outliers, regional_outliers_by, top_k_positions
+from video_game_sales_ii.sales_cube import dataset_fingerprint, rollup
+from video_game_sales_ii.title_shares import TOP_SHARE, title_shares, top_titles
+from video_game_sales_ii.video_game_sales_data_viz import CUBE_PATH, DATASET_PATH, VIZ_COLUMNS, load_sales_cube
+from video_game_sales_ii.year_buckets import bucket_years
+
+# A long running local service answering the blog post's questions as parameterized queries, so a dashboard does not rerun the script for each one.
+# The dataset, its cube and the title level tables are loaded once.  Each query's result is kept in an LRU cache keyed by the dataset version, the query and its parameters; the dataset is reloaded when its files change.
+# Queries are computed in worker threads, so the event loop keeps answering cached queries while a new one is computed, and concurrent requests for the same result share one computation.
+# Run from the repository root: python portfolio.py serve --port 8765, then e.g. curl 'localhost:8765/top_games?n=10&region=JP_Sales'
+CACHE_SIZE = 256
+# Seconds between checks that the dataset files have not changed.
+VERSION_CHECK_INTERVAL = 2.0
+SALES_COLUMNS = list(REGIONS) + ['Global_Sales']
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+## DATASET
+
+def load_state(dataset_path=DATASET_PATH, cube_path=CUBE_PATH):
+    """Returns the dataset version and everything the queries read: the records, the cube, every title's sales and every publisher's ranked titles."""
+    games = read_games(dataset_path, columns=VIZ_COLUMNS)
+    return {
+        'version': dataset_fingerprint(dataset_path),
+        'games': games,
+        'cube': load_sales_cube(dataset_path, cube_path),
+        'titles': games.groupby('Name')[SALES_COLUMNS].sum().reset_index(),
+        'publisher_title_shares': title_shares(games[subset_mask(games, 'complete_pub')]),
+    }
+
+
+## QUERIES
+# Each query takes the loaded state and its parameters and returns a dataframe.
+
+def top_games(state, n=25, region='Global_Sales'):
+    """The n titles with the most sales in a region (a sales column), largest first."""
+    if region not in SALES_COLUMNS:
+        raise ValueError(f"Unknown region {region!r}; use one of {SALES_COLUMNS}")
+    titles = state['titles']
+    return titles.iloc[top_k_positions(titles[region].to_numpy(dtype='float64'), n)].reset_index(drop=True)
+
+
+def market_share(state, publishers=None, start=None, end=None):
+    """Each publisher's sales and share of every year's sales, for the given publishers (default all) and years."""
+    cube = state['cube']
+    shares = rollup(cube, ['Publisher', 'year'], subset='complete_pub_year').astype({'year': 'int32'})
+    sales_by_year = rollup(cube, ['year'], subset='complete_year').astype({'year': 'int32'})
+    shares = shares.merge(sales_by_year, on='year', how='left', suffixes=('', '_total_by_year'))
+    shares['global_sales_percent'] = shares['Global_Sales'] / shares['Global_Sales_total_by_year']
+    if publishers:
+        shares = shares[shares['Publisher'].isin(publishers)]
+    if start is not None:
+        shares = shares[shares['year'] >= start]
+    if end is not None:
+        shares = shares[shares['year'] <= end]
+    return shares.reset_index(drop=True)
+
+
+def genre_share(state, scheme='decade'):
+    """Each genre's sales and share of the sales of every decade, five year span or console generation (see year_buckets.py)."""
+    cube = state['cube'][subset_mask(state['cube'], 'complete_year')]
+    cube = cube.assign(period=bucket_years(cube['year'], scheme))
+    by_genre = rollup(cube, ['Genre', 'period'])
+    by_genre['global_sales_percent'] = by_genre['Global_Sales'] / by_genre.groupby('period', observed=True)['Global_Sales'].transform('sum')
+    return by_genre
+
+
+def regional_surprises(state, k=5, top_k=25, by=None):
+    """The titles in each region's top k that are not in the global top top_k, overall or within every value of by (e.g. year)."""
+    if by:
+        return regional_outliers_by(state['games'], by, k, top_k)
+    return regional_outliers(state['titles'], k, top_k)
+
+
+def publisher_success(state, publisher=None, cutoff=TOP_SHARE):
+    """The titles making up the top cutoff of a publisher's sales (default every publisher's)."""
+    top = top_titles(state['publisher_title_shares'], cutoff)
+    if publisher:
+        top = top[top['Publisher'] == publisher]
+    return top.reset_index(drop=True)
+
+
+def comma_list(text):
+    """Returns the values of a comma separated parameter."""
+    return [value for value in text.split(',') if value]
+
+
+# Every query and the type of each of its parameters.
+QUERIES = {
+    'top_games': (top_games, {'n': int, 'region': str}),
+    'market_share': (market_share, {'publishers': comma_list, 'start': int, 'end': int}),
+    'genre_share': (genre_share, {'scheme': str}),
+    'regional_surprises': (regional_surprises, {'k': int, 'top_k': int, 'by': str}),
+    'publisher_success': (publisher_success, {'publisher': str, 'cutoff': float}),
+}
+
+
+def parse_params(query, raw_params):
+    """Returns the parameters of a query converted to their types.  Raises ValueError for a parameter the query does not take or a value of the wrong type."""
+    _, param_types = QUERIES[query]
+    params = {}
+    for name, values in raw_params.items():
+        if name not in param_types:
+            raise ValueError(f"{query} has no parameter {name!r}; it takes {sorted(param_types)}")
+        params[name] = param_types[name](values[-1])
+    return params
+
+
+## SERVICE
+
+class QueryService:
+    """Answers queries against the loaded dataset, with an LRU cache of results and one computation for concurrent requests of the same result."""
+
+    def __init__(self, dataset_path=DATASET_PATH, cube_path=CUBE_PATH, cache_size=CACHE_SIZE):
+        self.dataset_path = dataset_path
+        self.cube_path = cube_path
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.stats = {'hits': 0, 'misses': 0, 'reloads': 0}
+        self.state = load_state(dataset_path, cube_path)
+        self.checked_at = time.monotonic()
+
+    async def current_state(self):
+        """Returns the loaded state, reloading it first if the dataset files changed."""
+        if time.monotonic() - self.checked_at >= VERSION_CHECK_INTERVAL:
+            self.checked_at = time.monotonic()
+            version = await asyncio.to_thread(dataset_fingerprint, self.dataset_path)
+            if version != self.state['version']:
+                self.state = await asyncio.to_thread(load_state, self.dataset_path, self.cube_path)
+                self.stats['reloads'] += 1
+        return self.state
+
+    async def answer(self, query, params):
+        """Returns the JSON text of a query's result, the dataset version it was computed against and whether it came from the cache."""
+        state = await self.current_state()
+        key = (state['version'], query, tuple(sorted((name, repr(value)) for name, value in params.items())))
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return self.cache[key], key[0], True
+        if key in self.pending:
+            self.stats['hits'] += 1
+            return await asyncio.shield(self.pending[key]), key[0], True
+        self.stats['misses'] += 1
+        func, _ = QUERIES[query]
+        self.pending[key] = asyncio.ensure_future(asyncio.to_thread(lambda: func(state, **params).to_json(orient='records')))
+        try:
+            result = await asyncio.shield(self.pending[key])
+        finally:
+            del self.pending[key]
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result, key[0], False
+
+    async def respond(self, target):
+        """Returns the status and JSON body for a request target such as /top_games?n=10."""
+        url = urlsplit(target)
+        query = url.path.strip('/')
+        if query == '':
+            return 200, json.dumps({name: {'about': func.__doc__, 'parameters': sorted(param_types)} for name, (func, param_types) in QUERIES.items()})
+        if query == 'stats':
+            return 200, json.dumps({**self.stats, 'cached': len(self.cache), 'version': self.state['version']})
+        if query not in QUERIES:
+            return 404, json.dumps({'error': f"Unknown query {query!r}; use one of {sorted(QUERIES)}"})
+        try:
+            params = parse_params(query, parse_qs(url.query))
+            rows, version, cached = await self.answer(query, params)
+        except (ValueError, KeyError, TypeError) as error:
+            return 400, json.dumps({'error': str(error)})
+        # Any other failure of a query is answered too, so the client is not left with a dropped connection.
+        except Exception as error:
+            return 500, json.dumps({'error': f'{type(error).__name__}: {error}'})
+        return 200, f'{{"query": {json.dumps(query)}, "version": "{version}", "cached": {json.dumps(cached)}, "rows": {rows}}}'
+
+    async def handle(self, reader, writer):
+        """Serves the requests of one HTTP/1.1 connection, keeping it open until the client closes it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if method != 'GET':
+                    status, body = 405, json.dumps({'error': 'Only GET is supported'})
+                else:
+                    status, body = await self.respond(target)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                payload = body.encode()
+                writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service, host='127.0.0.1', port=8765, socket_path=None):
+    """Serves queries until cancelled, on localhost or on a Unix socket."""
+    if socket_path:
+        server = await asyncio.start_unix_server(service.handle, path=socket_path)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the analyses of the cleaned dataset as JSON queries over HTTP on localhost.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--socket', help='listen on this Unix socket instead of a localhost port')
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE, help='number of query results kept')
+    args = parser.parse_args(argv)
+
+    service = QueryService(cache_size=args.cache_size)
+    print(f"Loaded {len(service.state['games']):,} records; serving {', '.join(QUERIES)} on {args.socket or f'http://127.0.0.1:{args.port}/'}")
+    try:
+        asyncio.run(serve(service, port=args.port, socket_path=args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
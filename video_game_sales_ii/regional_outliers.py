@@ -0,0 +1,82 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from video_game_sales_i.games_store import DATASET_PATH, read_games
+
+# Finds the titles in each region's top k by sales that are not in the global top K, for every region at once.
+# Each top k is a partial selection (np.argpartition) of the titles, which is linear in the number of titles, instead of a full sort of them for every region.  Only the k selected titles are sorted, to rank them.
+# Run from the repository root: python -m video_game_sales_ii.regional_outliers --k 5 --top-k 25 --by year
+# The regional sales columns and the name of their region.
+REGIONS = {'NA_Sales': 'North America', 'EU_Sales': 'Europe', 'JP_Sales': 'Japan', 'Other_Sales': 'Other'}
+SALES_COLUMNS = list(REGIONS) + ['Global_Sales']
+
+
+def top_k_positions(values, k):
+    """Returns the positions of the k largest values, largest first.  Ties are ranked in the order the values come in, including at the kth place."""
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    if k >= len(values):
+        return np.lexsort((np.arange(len(values)), -values))
+    # Every value at least as large as the kth largest, of which there are only more than k when the kth value is tied.
+    kth_value = values[np.argpartition(-values, k - 1)[k - 1]]
+    candidates = np.flatnonzero(values >= kth_value)
+    return candidates[np.lexsort((candidates, -values[candidates]))][:k]
+
+
+def regional_outliers(titles, k=5, top_k=25, regions=REGIONS, value='Global_Sales'):
+    """Returns the titles ranked in a region's top k that are not in the global top top_k, one row per (region, title) with its regional rank, regional sales, global sales and global rank.
+
+    titles has one row per title, with a Name column and the sales columns of regions, e.g. the records grouped by Name.
+    """
+    global_sales = titles[value].to_numpy(dtype='float64')
+    in_global_top = np.zeros(len(titles), dtype=bool)
+    in_global_top[top_k_positions(global_sales, top_k)] = True
+    outliers = []
+    for sales, region in regions.items():
+        top = top_k_positions(titles[sales].to_numpy(dtype='float64'), k)
+        ranks = np.arange(1, len(top) + 1)
+        keep = ~in_global_top[top]
+        top, ranks = top[keep], ranks[keep]
+        outliers.append(pd.DataFrame({
+            'Region': region,
+            'Name': titles['Name'].to_numpy()[top],
+            'regional_rank': ranks,
+            'Regional_Sales': titles[sales].to_numpy()[top],
+            value: global_sales[top],
+            # One more than the number of titles with higher sales, compared only for the few outliers.
+            'global_rank': (global_sales[None, :] > global_sales[top, None]).sum(axis=1) + 1,
+        }))
+    return pd.concat(outliers, ignore_index=True)
+
+
+def regional_outliers_by(games, by, k=5, top_k=25, regions=REGIONS, value='Global_Sales'):
+    """Returns the regional outliers of every value of by (e.g. year or Platform), ranking titles within each slice.  The records are grouped by (by, Name) once for all slices."""
+    titles = games.groupby([by, 'Name'], observed=True, sort=True)[list(regions) + [value]].sum().reset_index()
+    slices = []
+    for by_value, slice_titles in titles.groupby(by, observed=True, sort=True):
+        outliers = regional_outliers(slice_titles, k, top_k, regions, value)
+        outliers.insert(0, by, by_value)
+        slices.append(outliers)
+    return pd.concat(slices, ignore_index=True) if slices else pd.DataFrame()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the titles in each region's top k that are not in the global top K.")
+    parser.add_argument('path', nargs='?', default=DATASET_PATH, help='Parquet dataset written by the cleaning script')
+    parser.add_argument('--k', type=int, default=5, help="size of each region's top list")
+    parser.add_argument('--top-k', type=int, default=25, help='size of the global top list')
+    parser.add_argument('--by', help='rank titles within each value of this column, e.g. year or Platform')
+    args = parser.parse_args()
+
+    games = read_games(args.path, columns=['Name'] + SALES_COLUMNS + ([args.by] if args.by else []))
+    if args.by:
+        outliers = regional_outliers_by(games, args.by, args.k, args.top_k)
+    else:
+        outliers = regional_outliers(games.groupby('Name')[SALES_COLUMNS].sum().reset_index(), args.k, args.top_k)
+    print(outliers.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
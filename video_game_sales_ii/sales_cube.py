@@ -0,0 +1,71 @@
+import hashlib
+import inspect
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from video_game_sales_i.games_store import subset_mask
+
+# A pre-aggregated cube of the cleaned records: the record count and the five sales measures for every (Publisher, Genre, Platform, year) that occurs.
+# Null publishers and years are kept as their own cells, so the subsets with complete year and/or publisher data are slices of the cube like they are filters of the dataset.
+# The charts roll the cube up to the dimensions they need instead of grouping every record again.  The cube is written next to the dataset and only rebuilt when the dataset or the code that builds it changes.
+CUBE_DIMENSIONS = ['Publisher', 'Genre', 'Platform', 'year']
+MEASURES = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Global_Sales']
+# Columns read from the dataset to build the cube.
+CUBE_COLUMNS = CUBE_DIMENSIONS + MEASURES
+# Schema metadata key holding the fingerprint the cube was built from.
+FINGERPRINT_KEY = b'cube_fingerprint'
+
+
+def build_cube(games):
+    """Returns the cube of a dataframe of cleaned records: one row per (Publisher, Genre, Platform, year) with its number of records and summed sales."""
+    grouped = games.groupby(CUBE_DIMENSIONS, dropna=False, observed=True, sort=True)
+    cube = grouped[MEASURES].sum()
+    cube.insert(0, 'records', grouped.size())
+    return cube.reset_index()
+
+
+def dataset_fingerprint(path, *funcs):
+    """Returns a hash of the name, size and modification time of every file in a dataset and of the source of funcs, so the cube is rebuilt when either changes."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            stat = os.stat(os.path.join(root, name))
+            digest.update(json.dumps([os.path.relpath(os.path.join(root, name), path), stat.st_size, stat.st_mtime_ns]).encode())
+    for func in funcs:
+        digest.update(inspect.getsource(func).encode())
+    return digest.hexdigest()
+
+
+def write_cube(cube, path, fingerprint):
+    """Writes the cube to a Parquet file along with the fingerprint of the dataset it was built from."""
+    table = pa.Table.from_pandas(cube, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), FINGERPRINT_KEY: fingerprint.encode()})
+    pq.write_table(table, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def read_cube(path, fingerprint):
+    """Returns the cube stored at path, or None if there is none or it was built from a different dataset."""
+    if not os.path.exists(path):
+        return None
+    if (pq.read_schema(path).metadata or {}).get(FINGERPRINT_KEY, b'').decode() != fingerprint:
+        return None
+    return pq.read_table(path).to_pandas()
+
+
+def slice_cube(cube, subset='all', **values):
+    """Returns the cells of the cube in a subset (see games_store.SUBSETS) whose dimensions have the given values, e.g. slice_cube(cube, 'complete_year', Platform=['PS2', 'PS3'])."""
+    mask = subset_mask(cube, subset)
+    for column, value in values.items():
+        mask &= cube[column].isin(value if isinstance(value, (list, tuple, set)) else [value])
+    return cube[mask]
+
+
+def rollup(cube, by, measures=None, subset='all', **values):
+    """Returns the measures (default Global_Sales) summed over every dimension not in by, for a slice of the cube.  Same result as grouping the records themselves by the columns in by."""
+    measures = ['Global_Sales'] if measures is None else measures
+    return slice_cube(cube, subset, **values).groupby(by, observed=True)[measures].sum().reset_index()
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Normalizes game titles to the name of their series, e.g. 'Call of Duty: Black Ops II' to 'Call of Duty'.
+# The rules run once for each unique title rather than once per record: the titles are factorized into codes, the unique titles are normalized, and the series names are taken back to the records by code.
+# Normalized titles are kept in a memo, which can be written to disk and read on later runs so only titles never seen before are normalized.  The memo is discarded when the rules change.
+# The steps applied to every title, in order: (operation, argument).  See OPERATIONS.
+SERIES_RULES = [
+    # Strip digits from the right.
+    ('rstrip', '0123456789'),
+    # Strip roman numerals from the right.
+    ('rstrip', 'ivxIVX'),
+    # Keep the part before a colon.
+    ('split', ':'),
+    # Strip digits again.
+    ('rstrip', '0123456789'),
+    # Strip 'New' from Super Mario Bros.
+    ('removeprefix', 'New'),
+    # Strip white space.
+    ('strip', None),
+]
+# Series whose titles differ by more than the rules remove: any normalized title containing the text becomes the series name.  The first match wins.
+SERIES_ALIASES = [
+    ('Pokemon', 'Pokemon'),
+    ('Super Mario', 'Super Mario'),
+    ('FIFA', 'FIFA'),
+    ('Wii Sports', 'Wii Sports'),
+]
+OPERATIONS = {
+    'rstrip': lambda title, chars: title.rstrip(chars),
+    'lstrip': lambda title, chars: title.lstrip(chars),
+    'strip': lambda title, chars: title.strip(chars),
+    'split': lambda title, sep: title.split(sep)[0],
+    'removeprefix': lambda title, prefix: title.removeprefix(prefix),
+    'removesuffix': lambda title, suffix: title.removesuffix(suffix),
+}
+SERIES_MEMO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'series_names_memo.json')
+
+
+def normalize_title(title, rules=SERIES_RULES, aliases=SERIES_ALIASES):
+    """Returns the series name of one title."""
+    for operation, argument in rules:
+        title = OPERATIONS[operation](title, argument)
+    for text, series in aliases:
+        if text in title:
+            return series
+    return title
+
+
+def rules_fingerprint(rules=SERIES_RULES, aliases=SERIES_ALIASES):
+    """Returns a hash of the rules and aliases, stored with the memo so it is discarded when they change."""
+    return hashlib.sha256(json.dumps([rules, aliases]).encode()).hexdigest()
+
+
+def load_memo(path=SERIES_MEMO_PATH, rules=SERIES_RULES, aliases=SERIES_ALIASES):
+    """Returns the memo of normalized titles stored at path, or an empty memo if there is none or it was made with other rules."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        stored = json.load(f)
+    return stored['names'] if stored.get('rules') == rules_fingerprint(rules, aliases) else {}
+
+
+def save_memo(memo, path=SERIES_MEMO_PATH, rules=SERIES_RULES, aliases=SERIES_ALIASES):
+    """Writes the memo of normalized titles to path along with the fingerprint of the rules that made it."""
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'rules': rules_fingerprint(rules, aliases), 'names': memo}, f)
+    os.replace(path + '.tmp', path)
+
+
+def series_names(titles, memo=None, rules=SERIES_RULES, aliases=SERIES_ALIASES):
+    """Returns the series name of every title, with the index of titles.  Only the unique titles not already in memo are normalized, and they are added to it."""
+    memo = {} if memo is None else memo
+    titles = pd.Series(titles)
+    if isinstance(titles.dtype, pd.CategoricalDtype):
+        codes, uniques = titles.cat.codes.to_numpy(), titles.cat.categories
+    else:
+        codes, uniques = pd.factorize(titles)
+    for title in uniques:
+        if title not in memo:
+            memo[title] = normalize_title(title, rules, aliases)
+    names = np.array([memo[title] for title in uniques] + [None], dtype=object)
+    # Null titles have code -1, which takes the None at the end.
+    return pd.Series(names[codes], index=titles.index, name=titles.name)
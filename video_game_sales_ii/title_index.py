@@ -0,0 +1,161 @@
+import argparse
+import bisect
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from video_game_sales_i.games_store import DATASET_PATH, read_games
+from video_game_sales_ii.sales_cube import FINGERPRINT_KEY, dataset_fingerprint
+
+# A search index over the titles of the cleaned dataset, so looking up titles and publishers reads a few posting lists instead of scanning every record.
+# The token index maps every word (lower case) of a title to the positions it appears at: row * MAX_TOKENS + the word's place in the title.  A phrase matches where its words' positions follow on from each other, so a phrase query is an intersection of shifted posting lists.
+# The Name and Publisher indexes map every exact value to its rows.  Every query returns row positions in the dataset as read_games reads it in full, e.g. games_final.iloc[search(index, 'call of duty')].
+# Run from the repository root: python -m video_game_sales_ii.title_index "rainbow six" --publisher Ubisoft
+# Titles have fewer words than this; it spaces out the positions of different rows in the token index.
+MAX_TOKENS = 1024
+# Columns with an exact match index.
+EXACT_COLUMNS = ['Name', 'Publisher']
+# Written next to the dataset and rebuilt whenever the dataset changes.
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'games_title_index.parquet')
+EMPTY = np.array([], dtype=np.int64)
+
+
+def tokenize(text):
+    """Returns the lower case words of a title or query."""
+    return re.findall(r'\w+', text.lower())
+
+
+def build_title_index(games):
+    """Returns the search index of a dataframe of cleaned records: a dictionary of {key: sorted positions} for the tokens and for every column in EXACT_COLUMNS."""
+    codes, titles = pd.factorize(games['Name'])
+    # Each unique title is tokenized once and its tokens are joined to its rows by code.
+    title_tokens = pd.DataFrame([(code, token, offset) for code, title in enumerate(titles) for offset, token in enumerate(tokenize(title))], columns=['code', 'token', 'offset'])
+    rows = pd.DataFrame({'code': codes, 'row': np.arange(len(codes), dtype=np.int64)})
+    postings = rows.merge(title_tokens, on='code')
+    postings['position'] = postings['row'] * MAX_TOKENS + postings['offset']
+    index = {'tokens': group_positions(postings['token'], postings['position'])}
+    for column in EXACT_COLUMNS:
+        values = games[column].reset_index(drop=True)
+        present = values.notna().to_numpy()
+        index[column] = group_positions(values[present], np.flatnonzero(present))
+    index['sorted_tokens'] = sorted(index['tokens'])
+    return index
+
+
+def group_positions(keys, positions):
+    """Returns a dictionary of every key and its sorted positions."""
+    positions = np.asarray(positions, dtype=np.int64)
+    return {key: np.sort(positions[rows]) for key, rows in pd.Series(np.asarray(keys)).groupby(np.asarray(keys)).indices.items()}
+
+
+def postings_table(index):
+    """Returns the index as one long table of (kind, key, position), the form it is written in."""
+    kinds = ['tokens'] + EXACT_COLUMNS
+    lengths = [len(positions) for kind in kinds for positions in index[kind].values()]
+    return pd.DataFrame({
+        'kind': np.repeat([kind for kind in kinds for _ in index[kind]], lengths),
+        'key': np.repeat([key for kind in kinds for key in index[kind]], lengths),
+        'position': np.concatenate([positions for kind in kinds for positions in index[kind].values()] or [EMPTY]),
+    })
+
+
+def index_from_postings(table):
+    """Returns the index of a table written by postings_table."""
+    index = {}
+    for kind, kind_postings in table.groupby('kind', sort=False):
+        index[kind] = group_positions(kind_postings['key'], kind_postings['position'])
+    for kind in ['tokens'] + EXACT_COLUMNS:
+        index.setdefault(kind, {})
+    index['sorted_tokens'] = sorted(index['tokens'])
+    return index
+
+
+def write_title_index(index, path, fingerprint):
+    """Writes the index to a Parquet file along with the fingerprint of the dataset it was built from."""
+    table = pa.Table.from_pandas(postings_table(index), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), FINGERPRINT_KEY: fingerprint.encode()})
+    pq.write_table(table, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def read_title_index(path, fingerprint):
+    """Returns the index stored at path, or None if there is none or it was built from a different dataset."""
+    if not os.path.exists(path):
+        return None
+    if (pq.read_schema(path).metadata or {}).get(FINGERPRINT_KEY, b'').decode() != fingerprint:
+        return None
+    return index_from_postings(pq.read_table(path).to_pandas())
+
+
+def load_title_index(dataset_path=DATASET_PATH, index_path=INDEX_PATH):
+    """Returns the index of the dataset, read from index_path if it was built from the same dataset, otherwise built from the dataset's Name and Publisher columns and written to index_path."""
+    fingerprint = dataset_fingerprint(dataset_path, tokenize, build_title_index)
+    index = read_title_index(index_path, fingerprint)
+    if index is None:
+        index = build_title_index(read_games(dataset_path, columns=EXACT_COLUMNS))
+        write_title_index(index, index_path, fingerprint)
+    return index
+
+
+def lookup(index, column, value, publisher=None):
+    """Returns the rows whose column (Name or Publisher) is exactly value.  With publisher, only that publisher's rows are returned."""
+    rows = index[column].get(value, EMPTY)
+    if publisher is not None:
+        rows = np.intersect1d(rows, index['Publisher'].get(publisher, EMPTY), assume_unique=True)
+    return rows
+
+
+def prefix_positions(index, prefix):
+    """Returns the positions of every token starting with prefix."""
+    sorted_tokens = index['sorted_tokens']
+    start = bisect.bisect_left(sorted_tokens, prefix)
+    matches = []
+    for token in sorted_tokens[start:]:
+        if not token.startswith(prefix):
+            break
+        matches.append(index['tokens'][token])
+    # Positions of different tokens never coincide, so the union is a sort.
+    return np.sort(np.concatenate(matches)) if matches else EMPTY
+
+
+def search(index, phrase, prefix=False, publisher=None):
+    """Returns the sorted rows whose title contains the words of phrase in order, ignoring case and punctuation, e.g. search(index, 'call of duty').
+
+    With prefix, the last word of phrase also matches longer words starting with it ('assassin' matches "Assassins").  With publisher, only that publisher's rows are returned.
+    """
+    tokens = tokenize(phrase)
+    if not tokens:
+        return EMPTY
+    matches = None
+    for offset, token in enumerate(tokens):
+        positions = prefix_positions(index, token) if prefix and offset == len(tokens) - 1 else index['tokens'].get(token, EMPTY)
+        # Shift every word back to where the phrase would start, so a phrase match is a position all of them share.
+        shifted = positions - offset
+        matches = shifted if matches is None else np.intersect1d(matches, shifted, assume_unique=True)
+    rows = np.unique(matches // MAX_TOKENS)
+    if publisher is not None:
+        rows = np.intersect1d(rows, lookup(index, 'Publisher', publisher), assume_unique=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search the titles of the cleaned dataset.')
+    parser.add_argument('phrase', help='words to find in order, e.g. "call of duty"')
+    parser.add_argument('--prefix', action='store_true', help='let the last word match longer words starting with it')
+    parser.add_argument('--publisher', help='only search titles from this publisher')
+    parser.add_argument('--dataset', default=DATASET_PATH, help='Parquet dataset written by the cleaning script')
+    parser.add_argument('--index', default=INDEX_PATH, help='where the index is kept')
+    args = parser.parse_args()
+
+    index = load_title_index(args.dataset, args.index)
+    rows = search(index, args.phrase, prefix=args.prefix, publisher=args.publisher)
+    games = read_games(args.dataset, columns=['Name', 'Platform', 'Publisher', 'year', 'Global_Sales'])
+    print(games.iloc[rows].to_string())
+
+
+if __name__ == '__main__':
+    main()
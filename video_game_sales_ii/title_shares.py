@@ -0,0 +1,64 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from video_game_sales_i.games_store import DATASET_PATH, read_games
+
+# Ranks every title within every publisher by its share of the publisher's sales, for all publishers at once.
+# One groupby sums each (Publisher, Name) and one sort ranks the titles within each publisher; the totals and running shares are grouped sums over that result.  Filtering the records once per publisher instead scans every record for every publisher.
+# Run from the repository root: python -m video_game_sales_ii.title_shares --cutoff 0.15 --output top_titles.csv
+# Share of a publisher's sales that its top titles make up, as in the blog post's tables.
+TOP_SHARE = 0.15
+
+
+def title_shares(games, by='Publisher', value='Global_Sales'):
+    """Returns one row per (by, Name) with its sales, its share of the by value's total sales, the running share of the titles ranked above it and its rank.  Records with a null by value are left out."""
+    title_sales = games.groupby([by, 'Name'], observed=True, sort=True)[value].sum().reset_index()
+    # Titles in order of sales within each group; the stable sort keeps ties in Name order.
+    order = np.lexsort((-title_sales[value].to_numpy(), title_sales[by].to_numpy()))
+    shares = title_sales.iloc[order].reset_index(drop=True)
+    grouped = shares.groupby(by, observed=True, sort=False)[value]
+    shares['total_sales'] = grouped.transform('sum')
+    shares['percent_sales'] = shares[value] / shares['total_sales']
+    shares['cum_percent'] = shares['percent_sales'].groupby(shares[by], sort=False).cumsum()
+    shares['rank'] = grouped.cumcount() + 1
+    return shares
+
+
+def top_titles(shares, cutoff=TOP_SHARE):
+    """Returns the titles of title_shares whose running share of sales is within cutoff, i.e. those making up the top cutoff of each publisher's sales."""
+    return shares[shares['cum_percent'] <= cutoff]
+
+
+def share_table(top, by_value, by='Publisher', value='Global_Sales'):
+    """Returns the top titles of one by value formatted for a table, and its total sales.  Any by value with no titles within the cutoff gets an empty table."""
+    titles = top[top[by] == by_value]
+    table = pd.DataFrame({
+        'Game Title': titles['Name'],
+        'Sales': titles[value].map('${:,.2f}M'.format),
+        'Percentage of Total Sales': titles['percent_sales'].map('{:.2%}'.format),
+    })
+    total_sales = titles['total_sales'].iloc[0] if len(titles) else np.nan
+    return table, total_sales
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the titles making up the top share of every publisher's sales.")
+    parser.add_argument('path', nargs='?', default=DATASET_PATH, help='Parquet dataset written by the cleaning script')
+    parser.add_argument('--cutoff', type=float, default=TOP_SHARE, help='share of sales the listed titles make up')
+    parser.add_argument('--by', default='Publisher', help='column to rank titles within, e.g. Publisher, Platform or Genre')
+    parser.add_argument('--output', help='write the titles to this CSV file instead of printing them')
+    args = parser.parse_args()
+
+    games = read_games(args.path, columns=[args.by, 'Name', 'Global_Sales'], subset='complete_pub' if args.by == 'Publisher' else 'all')
+    top = top_titles(title_shares(games, by=args.by), args.cutoff)
+    if args.output:
+        top.to_csv(args.output, index=False)
+        print(f"Wrote {len(top):,} titles of {top[args.by].nunique():,} {args.by} values to {args.output}")
+    else:
+        print(top.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,15 @@
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mtick
-from matplotlib.ticker import PercentFormatter
-import seaborn as sns
-import pickle
-
-from great_tables import GT, md, html, style, loc, vals
+import os
+import argparse
+
+from video_game_sales_i.games_store import DATASET_PATH, read_games, subset_mask
+from video_game_sales_i.render import render_artifacts
+from video_game_sales_ii.year_buckets import bucket_years
+from video_game_sales_ii.regional_outliers import regional_outliers
+from video_game_sales_ii.series_names import load_memo, save_memo, series_names
+from video_game_sales_ii.title_index import build_title_index, load_title_index
+from video_game_sales_ii.title_shares import share_table, title_shares, top_titles
+from video_game_sales_ii.sales_cube import CUBE_COLUMNS, build_cube, dataset_fingerprint, read_cube, rollup, write_cube
 
 # Set print display options
 pd.set_option('display.max_rows', 200)
@@ -14,268 +17,168 @@ pd.set_option('display.max_columns', 50)
 pd.set_option('display.max_colwidth', 150)
 
 # Suppress chained assignments warning
-pd.options.mode.chained_assignment = None 
-
-# Set palette for visualizations.
-palette = sns.color_palette("Paired")
-sns.set_palette(palette="Paired", n_colors=12)
-
-# Formatting Functions
-def custom_dollar_formatter(x):
-    """Returns $X.XXB if number in millions is 4 or more digits long, returns $X.XXM if number is less than 1. For formatting numbers in tables."""
-    if x > 1000:
-        return f'${x/1000:,.2f}B'
-    elif x >1:
-        return f'${x:,.0f}M'
-    else:
-        return f'${x*1000000:,.0f}'      
-  
-def pickle_input(df_str):
-    with open(df_str+'.pickle', 'rb') as file:
-        df=pickle.load(file)
-        return df
-
-games_complete_year_final=pickle_input('games_complete_year_final')
-games_complete_pub_year_final=pickle_input('games_complete_pub_year_final')
-games_complete_pub_final=pickle_input('games_complete_pub_final')
-games_final=pickle_input('games_final')
-# Create a map from individual year to decade.
-decade_mapping = {}
-for yr in range(1980, 2021):
-    if yr >= 1980 and yr <1990: 
-        decade_mapping[yr]='1980s'
-    elif  yr >= 1990 and yr <2000: 
-        decade_mapping[yr]='1990s' 
-    elif  yr >= 2000 and yr <2010: 
-        decade_mapping[yr]='2000s' 
-    elif  yr >= 2000 and yr <2021: 
-        decade_mapping[yr]='2010s'  
-  
-games_complete_year_final['decade'] = games_complete_year_final['year'].replace(decade_mapping) 
-games_complete_pub_year_final['decade'] = games_complete_pub_year_final['year'].replace(decade_mapping) 
-
-# Create a dataframe of total sales by decade and publisher.
-pub_sales_by_decade = games_complete_pub_year_final.groupby(['Publisher', 'decade'])['Global_Sales'].sum().reset_index()
-# Select top 5 publishers in the 1980s for a later chart.
-early_publishers = pub_sales_by_decade.sort_values(['decade','Global_Sales'], ascending=[True, False] ).head(5)['Publisher']
-# Create a dataframe of total sales by decade.
-sales_by_decade = games_complete_year_final.groupby(['decade'])['Global_Sales'].sum().reset_index()
-# Create a dataframe of total sales by decade and publisher.
-games_grouped_by_genre = games_complete_year_final.groupby(['Genre', 'decade'])['Global_Sales'].sum().reset_index()
-
-# Create a dataframe to include the percentage of sales within each decade associated with each genre.
-genres_with_decade_sales = games_grouped_by_genre.merge(sales_by_decade, on='decade', how='left', suffixes=('', '_total_by_decade'))
-genres_with_decade_sales['global_sales_percent'] = genres_with_decade_sales['Global_Sales']/genres_with_decade_sales['Global_Sales_total_by_decade']
-
-# Create a chart showing the percentage of each decade's total sales each genre generated.
-#Axes Level
-g = sns.catplot(data=genres_with_decade_sales, kind = 'bar', x='decade', y='global_sales_percent',  hue='Genre', height=8, aspect=1.5)
-g.ax.set_xlabel("")
-g.ax.set_ylabel("Percentage of Each Decade's Total Video Game Sales", fontsize=14, labelpad=12)
-g.ax.yaxis.set_major_formatter(mtick.PercentFormatter(1.0,0))
-g.fig.suptitle("Genre Popularity within each Decade", fontsize=16)
-plt.show()
-
-## Publishing Teams Over Time
-# Calculate total sales generated by each publisher from 1980 to 2016.
-games_by_publisher = games_complete_pub_year_final.groupby(['Publisher', 'year'])['Global_Sales'].sum().reset_index()
-# Use the dataframe early_publishers to create a chart showing the market share of the most popular early publishers.
-early_publisher_sales = games_by_publisher[games_by_publisher['Publisher'].isin(early_publishers)]
-sales_by_publisher = games_complete_pub_year_final.groupby(['Publisher'])['Global_Sales'].sum().reset_index()
-highest_sales_publisher = sales_by_publisher[sales_by_publisher['Global_Sales']>=350.0]
-sales_by_year = games_complete_year_final.groupby(['year'])['Global_Sales'].sum().reset_index() 
-publishers_with_year_sales = games_by_publisher.merge(sales_by_year, on='year', how='left', suffixes=('', '_total_by_year'))
-publishers_with_year_sales['global_sales_percent'] = publishers_with_year_sales['Global_Sales']/publishers_with_year_sales['Global_Sales_total_by_year']
-
-early_publishers_with_year_sales = early_publisher_sales.merge(sales_by_year, on='year', how='left', suffixes=('', '_total_by_year'))
-
-early_publishers_with_year_sales['global_sales_percent'] = early_publishers_with_year_sales['Global_Sales']/early_publishers_with_year_sales['Global_Sales_total_by_year']
-top_publishers = publishers_with_year_sales.merge(highest_sales_publisher, on='Publisher', how='inner', suffixes=('', '_top'))
-top_pub_pivot = top_publishers.pivot_table(values="Global_Sales", index="year",columns="Publisher", fill_value=0, aggfunc='sum', margins=False).reset_index()
-
-###Early Leaders Publishing 
-sales_by_year = games_complete_year_final.groupby(['year'])['Global_Sales'].sum().reset_index() 
-
-highest_sales_publishers_list=highest_sales_publisher['Publisher'].values.tolist()
-early_publishers_list=early_publishers.values.tolist()
-interesting_publishers=enumerate(list(set(early_publishers_list+highest_sales_publishers_list)))
-
-def color_map_to_category(category_list):
-    """Returns a dictionary mapping categorical variables to colors."""
-    hue_colors={}
-    for i,j in category_list: 
-        color=palette[i]
-        hue_colors[j]=color
-    return hue_colors
-hue_colors=color_map_to_category(interesting_publishers)
-
-def market_share_by_year_plot(df,sup_ttl):
-    sns.set_context(rc={"lines.linewidth":6})
-    g = sns.relplot(data=df, kind='line', x='year', y='global_sales_percent', hue='Publisher', palette=hue_colors, height=8, aspect=1.5, legend='full')
-    g.set_axis_labels("", "Percentage of Each Year's Total Video Game Sales", fontsize=12,labelpad=10)
-    sns.move_legend(g, 'upper right', bbox_to_anchor=(0.5, 0.42, 0.5, 0.5), title="", fontsize=12, draggable=True)
-    g.ax.yaxis.set_major_formatter(mtick.PercentFormatter(1.0))
-    g.fig.suptitle(sup_ttl, fontsize=16)
-    plt.tight_layout()
-    plt.show()
-
-market_share_by_year_plot(top_publishers, "The Six Top Selling Publishers' Market Share by Year")
-market_share_by_year_plot(early_publishers_with_year_sales, "Publishers Dominating the Eighties")
-
-# Create chart of publisher sales by year.
-bottom=np.zeros(37)
-legend_labels =[]
-fig, ax = plt.subplots(figsize=(12,8))
-for n in range(1,7):
-   ax.bar(x=top_pub_pivot['year'], height=top_pub_pivot.iloc[:, n], bottom=bottom)
-   bottom += top_pub_pivot.iloc[:, n]
-   label=top_pub_pivot.columns[n]
-   legend_labels.append(label)
-ax.legend(labels=legend_labels)
-ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('${x:.0f}'))
-ax.set_ylabel("Sales (in Millions)", fontsize=14, labelpad=12)
-ax.spines[['top', 'right']].set_visible(False)
-fig.suptitle("Annual Global Sales by the Six Top Selling Publishers", fontsize=16)
-plt.show()
-
-def publisher_success(publisher, pdf_name):
+pd.options.mode.chained_assignment = None
+
+# The cleaned dataset written by video_game_sales_i/video_game_sales_data_clean.py.
+# The aggregate cube of the dataset (see sales_cube.py), rebuilt whenever the dataset changes.
+CUBE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'games_sales_cube.parquet')
+# Only the columns the charts use are read from disk.
+VIZ_COLUMNS = ['Name', 'Publisher', 'Genre', 'Platform', 'year', 'NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Global_Sales']
+
+# Publishers whose top selling games are shown in a table.
+SUCCESS_PUBLISHERS = ['Activision', 'Electronic Arts', 'Nintendo', 'Sony Computer Entertainment', 'Ubisoft', 'Take-Two Interactive']
+
+## AGGREGATIONS
+# Each aggregation takes the dataframes it needs and returns a dictionary of the dataframes it creates, like the stages of the cleaning pipeline.
+
+def sales_cube(games):
+    """Creates the aggregate cube of the cleaned records, with the decade of each year as one more dimension."""
+    cube = build_cube(games)
+    # Null years get a null decade; the cube keeps them as their own cells.
+    cube['decade'] = bucket_years(cube['year'], 'decade')
+    return {'cube': cube}
+
+def load_sales_cube(dataset_path=DATASET_PATH, cube_path=CUBE_PATH):
+    """Returns the aggregate cube of the dataset, read from cube_path if it was built from the same dataset, otherwise built with one scan of the dataset and written to cube_path."""
+    fingerprint = dataset_fingerprint(dataset_path, build_cube, sales_cube)
+    cube = read_cube(cube_path, fingerprint)
+    if cube is None:
+        cube = sales_cube(read_games(dataset_path, columns=CUBE_COLUMNS))['cube']
+        write_cube(cube, cube_path, fingerprint)
+    return cube
+
+def subsets(games_final):
+    """Creates the subset of records with complete publisher data, for the tables of each publisher's top games."""
+    # The subsets with complete years are slices of the cube (see rollup) rather than copies of the records.
+    games_complete_pub_final = games_final[subset_mask(games_final, 'complete_pub')]
+    return {'games_complete_pub_final': games_complete_pub_final}
+
+def genre_by_decade(cube):
+    """Creates the share of each decade's sales by genre, and the top publishers of the 1980s."""
+    # Create a dataframe of total sales by decade and publisher.
+    pub_sales_by_decade = rollup(cube, ['Publisher', 'decade'], subset='complete_pub_year')
+    # Select top 5 publishers in the 1980s for a later chart.
+    early_publishers = pub_sales_by_decade.sort_values(['decade','Global_Sales'], ascending=[True, False] ).head(5)['Publisher']
+    # Create a dataframe of total sales by decade.
+    sales_by_decade = rollup(cube, ['decade'], subset='complete_year')
+    # Create a dataframe of total sales by decade and publisher.
+    games_grouped_by_genre = rollup(cube, ['Genre', 'decade'], subset='complete_year')
+
+    # Create a dataframe to include the percentage of sales within each decade associated with each genre.
+    genres_with_decade_sales = games_grouped_by_genre.merge(sales_by_decade, on='decade', how='left', suffixes=('', '_total_by_decade'))
+    genres_with_decade_sales['global_sales_percent'] = genres_with_decade_sales['Global_Sales']/genres_with_decade_sales['Global_Sales_total_by_decade']
+    return {'pub_sales_by_decade': pub_sales_by_decade, 'early_publishers': early_publishers, 'sales_by_decade': sales_by_decade, 'games_grouped_by_genre': games_grouped_by_genre, 'genres_with_decade_sales': genres_with_decade_sales}
+
+def publisher_market_share(cube, early_publishers):
+    """Creates each publisher's share of every year's sales, for the top selling and the early publishers."""
+    ## Publishing Teams Over Time
+    # Calculate total sales generated by each publisher from 1980 to 2016.  Release year is an integer wherever it is complete.
+    games_by_publisher = rollup(cube, ['Publisher', 'year'], subset='complete_pub_year').astype({'year': 'int32'})
+    # Use the dataframe early_publishers to create a chart showing the market share of the most popular early publishers.
+    early_publisher_sales = games_by_publisher[games_by_publisher['Publisher'].isin(early_publishers)]
+    sales_by_publisher = rollup(cube, ['Publisher'], subset='complete_pub_year')
+    highest_sales_publisher = sales_by_publisher[sales_by_publisher['Global_Sales']>=350.0]
+    sales_by_year = rollup(cube, ['year'], subset='complete_year').astype({'year': 'int32'})
+    publishers_with_year_sales = games_by_publisher.merge(sales_by_year, on='year', how='left', suffixes=('', '_total_by_year'))
+    publishers_with_year_sales['global_sales_percent'] = publishers_with_year_sales['Global_Sales']/publishers_with_year_sales['Global_Sales_total_by_year']
+
+    early_publishers_with_year_sales = early_publisher_sales.merge(sales_by_year, on='year', how='left', suffixes=('', '_total_by_year'))
+
+    early_publishers_with_year_sales['global_sales_percent'] = early_publishers_with_year_sales['Global_Sales']/early_publishers_with_year_sales['Global_Sales_total_by_year']
+    top_publishers = publishers_with_year_sales.merge(highest_sales_publisher, on='Publisher', how='inner', suffixes=('', '_top'))
+    top_pub_pivot = top_publishers.pivot_table(values="Global_Sales", index="year",columns="Publisher", fill_value=0, aggfunc='sum', margins=False, observed=True).reset_index()
+    return {'games_by_publisher': games_by_publisher, 'early_publisher_sales': early_publisher_sales, 'sales_by_publisher': sales_by_publisher, 'highest_sales_publisher': highest_sales_publisher, 'sales_by_year': sales_by_year, 'publishers_with_year_sales': publishers_with_year_sales, 'early_publishers_with_year_sales': early_publishers_with_year_sales, 'top_publishers': top_publishers, 'top_pub_pivot': top_pub_pivot}
+
+def publisher_success(games_complete_pub_final):
     """Which individual games contributed the most to these publishers' success?"""
-    games_ = games_complete_pub_final[games_complete_pub_final['Publisher']==publisher]
-    total_sales = games_['Global_Sales'].sum()
-    top_games_= games_.groupby(['Name'])['Global_Sales'].sum().reset_index().sort_values('Global_Sales', ascending=False)
-    top_games_['percent_sales']=top_games_['Global_Sales']/total_sales
-    top_games_['cum_percent']=top_games_['percent_sales'].cumsum(axis=0)
-    top_15_pct = top_games_[top_games_['cum_percent']<=.15]
-    top_15_pct.drop(['cum_percent'], axis=1, inplace=True)
-    top_15_pct['Game Title']=top_15_pct['Name']
-    top_15_pct['Sales']=top_15_pct['Global_Sales'].map('${:,.2f}M'.format)
-    top_15_pct["Percentage of Total Sales"]=top_15_pct['percent_sales'].map('{:.2%}'.format)
-    top_15 = top_15_pct[['Game Title', 'Sales', 'Percentage of Total Sales']]
+    # Every publisher's titles are ranked at once; the tables are drawn for SUCCESS_PUBLISHERS.
+    publisher_title_shares = title_shares(games_complete_pub_final)
+    publisher_top_titles = top_titles(publisher_title_shares)
+    return {'publisher_title_shares': publisher_title_shares, 'publisher_top_titles': publisher_top_titles, 'publisher_success': {publisher: share_table(publisher_top_titles, publisher) for publisher in SUCCESS_PUBLISHERS}}
+
+def region_hits_table(outliers):
+    """Returns the regional outliers formatted for the table of regional best sellers."""
+    region_hits = pd.DataFrame({
+        'Name': outliers['Name'].to_numpy(),
+        'Game Title': outliers['Name'].to_numpy(),
+        'Region': outliers['Region'].to_numpy(),
+        'Regional Sales': outliers['Regional_Sales'].map('${:,.2f}M'.format).to_numpy(),
+        'Global Sales': outliers['Global_Sales'].map('${:,.2f}M'.format).to_numpy(),
+    }, index=outliers['regional_rank'].to_numpy() - 1)
+    return region_hits
+
+def top_games(games_final):
+    """Creates the top selling games of all time and the regional best sellers."""
+    ## What are the top selling games of all time?
+    best_games = games_final.groupby(['Name'])[['Global_Sales', 'NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales']].sum().reset_index()
+    best_games_sorted = best_games.sort_values(['Global_Sales'], ascending=False)
+    top_25_games_world = best_games_sorted.head(25)
 
-    if publisher=='Electronic Arts':
-        gt_tbl=(GT(top_15, rowname_col='Game Title').tab_header(title=f"Top 15% of {publisher.title()}' Video Game Sales", subtitle=f"Global Sales Between 1980 and 2016:  {custom_dollar_formatter(total_sales)}").tab_stubhead(label='Game Title').tab_style(
-            style=style.text(color='black'),
-            locations=[loc.body(), loc.column_labels(), loc.stubhead(), loc.header(), loc.stub()]))
-    else: 
-        gt_tbl=(GT(top_15, rowname_col='Game Title').tab_header(title=f"Top 15% of {publisher.title()}'s Video Game Sales", subtitle=f"Global Sales Between 1980 and 2016:  {custom_dollar_formatter(total_sales)}").tab_stubhead(label='Game Title').tab_style(
-            style=style.text(color='black'),
-            locations=[loc.body(), loc.column_labels(), loc.stubhead(), loc.header(), loc.stub()]))
-    gt_tbl.show()
-
-publisher_success('Activision', 'activision.pdf')
-publisher_success('Electronic Arts', 'electronic arts.pdf')
-publisher_success('Nintendo', 'nintendo.pdf')
-publisher_success('Sony Computer Entertainment','sony computer entertainment.pdf')
-publisher_success('Ubisoft','ubisoft.pdf')
-publisher_success('Take-Two Interactive','take-two interactive.pdf')    
-
-
-## The following four sections of code are "back of the envelope" work I did to support my blog post's text.
-
-ea=games_complete_pub_final[games_complete_pub_final['Publisher']=='Electronic Arts']
-ea_grouped = ea.groupby(['Name'])['NA_Sales'].sum().reset_index()
-ea_madden_07 = ea[ea['Name']=='Madden NFL 07']
-print(ea_madden_07.groupby(['Name'])['Global_Sales'].sum())
-print(ea_grouped.sort_values(['NA_Sales'], ascending=False).head(20))
-
-s=games_complete_pub_final[games_complete_pub_final['Publisher']=='Sony Computer Entertainment']
-s_grouped = s.groupby(['Name'])[['NA_Sales']].sum().reset_index()
-s_gt = s[s['Name']=='Gran Turismo 3: A-Spec']
-print(s_gt.groupby(['Name'])['NA_Sales'].sum())
-
-ubi=games_complete_pub_final[games_complete_pub_final['Publisher']=='Ubisoft']
-ubi_grouped = ubi.groupby(['Name', 'Year'])['Global_Sales'].sum().reset_index()
-ubi_r6 = ubi_grouped[ubi_grouped['Name'].str.contains('Rainbow Six')]
-ubi_assassin = ubi_grouped[ubi_grouped['Name'].str.contains('Assassin')]
-print(ubi_r6.sum())
-print(ubi_r6)
-
-act=games_complete_pub_final[games_complete_pub_final['Publisher']=='Activision']
-act_grouped = act.groupby(['Name'])['Global_Sales'].sum().reset_index()
-act_cod = act_grouped[act_grouped['Name'].str.contains('Call of Duty')]
-print(act_cod.sum())
-print(ubi_assassin)
-
-## What are the top selling games of all time?
-best_games = games_final.groupby(['Name'])[['Global_Sales', 'NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales']].sum().reset_index()
-best_games_sorted = best_games.sort_values(['Global_Sales'], ascending=False)
-top_25_games_world = best_games.sort_values(['Global_Sales'], ascending=False).head(25)
-
-surprises = []
-def regional_surprises(region, sales):
     # Are there any games in any region's top 5 that are NOT in the global top 25?
-    top_5_reg_games = best_games.sort_values([sales], ascending=False).head(5)
-    reg_merged = top_5_reg_games.merge(top_25_games_world, on='Name', how ='left', suffixes=('', '_top_25'), indicator=True)
-    reg_surprises = reg_merged.loc[reg_merged['_merge']=='left_only', ['Name', 'Global_Sales', sales]]
-    reg_surprises['Game Title']=reg_surprises['Name']
-    reg_surprises['Region']=region
-    reg_surprises['Regional Sales']=reg_surprises[sales].map('${:,.2f}M'.format)
-    reg_surprises['Global Sales']=reg_surprises['Global_Sales'].map('${:,.2f}M'.format)
-    reg_surprises.drop([sales, 'Global_Sales'], axis=1, inplace=True)
-    for i, row in reg_surprises.iterrows():
-        surprises.append(row)
-
-regional_surprises('North America', 'NA_Sales')   
-regional_surprises('Europe', 'EU_Sales')   
-regional_surprises('Japan', 'JP_Sales')   
-regional_surprises('Other', 'Other_Sales')
-
-region_hits = pd.DataFrame(surprises)
-region_tbl = (GT(region_hits, rowname_col='Game Title').tab_header(title="Regional Best Sellers", subtitle="Games ranked in the top 5 bestselling by region, but not ranked in the top 25 bestselling globally").tab_style(
-            style=style.text(color='black'),
-            locations=[loc.body(), loc.column_labels(), loc.stubhead(), loc.header(), loc.stub()]))
-region_tbl.show()
-region_tbl.save('region_tbl.pdf')
-
-top_sellers_world = top_25_games_world[['Name', 'Global_Sales']].sort_values('Global_Sales', ascending=True).reset_index()
-
-fig, ax = plt.subplots(figsize=(12.5,10), constrained_layout=True)
-ax.barh(y='Name', data=top_sellers_world, width='Global_Sales', color='#33a02c')
-ax.set_title("Top 25 Games by Global Sales", fontsize=16, linespacing=1.5)
-ax.set_xlabel("Global Sales in Millions of Dollars", fontsize=16, labelpad=12)
-ax.spines[['top', 'right']].set_visible(False)
-ax.xaxis.set_major_formatter(mtick.StrMethodFormatter('${x:.0f}M'))
-plt.yticks(fontsize=10)
-plt.show()
-
-## Top Selling Game Series
-## Begin by strip digits from the right
-games_final['simple_name'] = games_final['Name'].str.rstrip('0123456789')
-## Strip roman numerals from the right
-games_final['simple_name'] = games_final['simple_name'].str.rstrip('ivxIVX')
-## Split at colon
-games_final['simple_name'] = games_final['simple_name'].str.split(':').str[0]
-## Strip digits again
-games_final['simple_name'] = games_final['simple_name'].str.rstrip('0123456789')
-## Strip 'new' from Super Mario Bros.
-games_final['simple_name'] = games_final['simple_name'].str.removeprefix('New')
-## Strip white space
-games_final['simple_name'] = games_final['simple_name'].str.strip()
-
-simplenames = games_final['simple_name'].to_list()
-name_map = {}
-for name in simplenames:
-    if 'Pokemon' in name:
-        name_map[name]='Pokemon'
-    elif 'Super Mario' in name:
-        name_map[name]='Super Mario' 
-    elif 'FIFA' in name:
-        name_map[name]='FIFA' 
-    elif 'Wii Sports' in name:
-        name_map[name]='Wii Sports'     
-
-games_final['simple_name'] = games_final['simple_name'].replace(name_map)
-game_team = games_final.groupby(['simple_name'])['Global_Sales'].sum().reset_index()
-game_team_sorted = game_team.sort_values('Global_Sales', ascending=False)
-
-top_team = game_team_sorted.head(20).sort_values('Global_Sales', ascending=True).reset_index()
+    regional_top_outliers = regional_outliers(best_games, k=5, top_k=25)
+    region_hits = region_hits_table(regional_top_outliers)
+
+    top_sellers_world = top_25_games_world[['Name', 'Global_Sales']].sort_values('Global_Sales', ascending=True).reset_index()
+    return {'best_games': best_games, 'best_games_sorted': best_games_sorted, 'top_25_games_world': top_25_games_world, 'regional_top_outliers': regional_top_outliers, 'region_hits': region_hits, 'top_sellers_world': top_sellers_world}
+
+def game_series(games_final, series_memo):
+    """Creates the top selling game series."""
+    ## Top Selling Game Series
+    # The series name of each title, e.g. 'Call of Duty' for 'Call of Duty: Black Ops II', following the rules in series_names.py.  Each unique title is normalized once and titles already in series_memo are not normalized again.
+    # games_final is left as it is; the series name is added to a copy.
+    games_series = games_final.assign(simple_name=series_names(games_final['Name'], series_memo))
+    game_team = games_series.groupby(['simple_name'])['Global_Sales'].sum().reset_index()
+    game_team_sorted = game_team.sort_values('Global_Sales', ascending=False)
+
+    top_team = game_team_sorted.head(20).sort_values('Global_Sales', ascending=True).reset_index()
+    return {'games_series': games_series, 'game_team': game_team, 'game_team_sorted': game_team_sorted, 'top_team': top_team}
+
+# The aggregations in the order they run, with the names of the dataframes each one reads.
+# The cube is built by sales_cube, or read from disk by load_sales_cube before the aggregations run.  series_memo is read from and written to disk by main.
+AGGREGATIONS = [
+    ('subsets', subsets, ['games_final']),
+    ('genre_by_decade', genre_by_decade, ['cube']),
+    ('publisher_market_share', publisher_market_share, ['cube', 'early_publishers']),
+    ('publisher_success', publisher_success, ['games_complete_pub_final']),
+    ('top_games', top_games, ['games_final']),
+    ('game_series', game_series, ['games_final', 'series_memo']),
+]
+
+def run_aggregations(games_final, cube=None, series_memo=None, title_index=None):
+    """Runs every aggregation and returns a dictionary of all the dataframes they created.  The cube and the title index are built from games_final unless they are given; series_memo (see series_names.py) gains the titles normalized on this run."""
+    results = {'games_final': games_final, 'series_memo': {} if series_memo is None else series_memo}
+    results.update(sales_cube(games_final) if cube is None else {'cube': cube})
+    # Row positions in the title index are positions in games_final.
+    results['title_index'] = build_title_index(games_final) if title_index is None else title_index
+    for agg_name, func, inputs in AGGREGATIONS:
+        results.update(func(*[results[df_name] for df_name in inputs]))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Show the charts and tables for the blog post from the cleaned dataset.')
+    parser.add_argument('--render-dir', help='write the charts and tables to this folder instead of showing them, redrawing only the ones that changed')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes drawing charts and tables with --render-dir (default: one per CPU)')
+    parser.add_argument('--no-report', action='store_true', help='only run the aggregations; matplotlib, seaborn and great_tables are never imported')
+    args = parser.parse_args(argv)
+
+    cube = load_sales_cube()
+    games_final = read_games(DATASET_PATH, columns=VIZ_COLUMNS)
+    series_memo = load_memo()
+    memo_size = len(series_memo)
+    results = run_aggregations(games_final, cube, series_memo, load_title_index())
+    if len(series_memo) != memo_size:
+        save_memo(series_memo)
+    if args.no_report:
+        print(f"Aggregated {games_final.shape[0]:,} records into {len(results) - 1} results")
+        return
+    # The plotting and table libraries are only imported when something is drawn.
+    from video_game_sales_ii.viz_report import back_of_envelope, report_artifacts, show_report
+    if args.render_dir:
+        back_of_envelope(results['games_final'], results['title_index'])
+        drawn = render_artifacts(report_artifacts(results), args.render_dir, workers=args.workers)
+        print(f"Drew {len(drawn)} changed charts and tables in {args.render_dir}")
+    else:
+        show_report(results)
 
-fig, ax = plt.subplots(figsize=(12,10), constrained_layout=True)
-ax.barh(y='simple_name', data=top_team, width='Global_Sales', color='#6a3d9a')
-ax.set_xlabel("Global Sales in Millions of Dollars", fontsize=16, labelpad=12)
-ax.set_title("Top 20 Game Series by Global Sales", fontsize=16)
-ax.spines[['top', 'right']].set_visible(False)
-ax.xaxis.set_major_formatter(mtick.StrMethodFormatter('${x:.0f}M'))
-plt.xticks(fontsize=8)
-plt.yticks(fontsize=10)
-plt.show()
+if __name__ == '__main__':
+    main()
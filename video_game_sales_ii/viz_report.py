@@ -0,0 +1,168 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.ticker as mtick
+import seaborn as sns
+
+from great_tables import GT, md, html, style, loc, vals
+
+from video_game_sales_i.render import show_artifacts
+from video_game_sales_ii.title_index import lookup, search
+
+# The charts and tables of video_game_sales_data_viz.py.  They are kept apart from the aggregations so the data work runs without importing matplotlib, seaborn or great_tables; the script imports this module only when a render is requested.
+
+# Set palette for visualizations.
+palette = sns.color_palette("Paired")
+sns.set_palette(palette="Paired", n_colors=12)
+
+# Formatting Functions
+def custom_dollar_formatter(x):
+    """Returns $X.XXB if number in millions is 4 or more digits long, returns $X.XXM if number is less than 1. For formatting numbers in tables."""
+    if x > 1000:
+        return f'${x/1000:,.2f}B'
+    elif x >1:
+        return f'${x:,.0f}M'
+    else:
+        return f'${x*1000000:,.0f}'
+
+## CHARTS AND TABLES
+# Each chart and table is drawn by a function that returns it, so it can be shown inline or written to a file in batch mode (see video_game_sales_i/render.py).
+def color_map_to_category(category_list):
+    """Returns a dictionary mapping categorical variables to colors."""
+    hue_colors={}
+    for i,j in category_list:
+        color=palette[i]
+        hue_colors[j]=color
+    return hue_colors
+
+def genre_by_decade_chart(genres_with_decade_sales):
+    """Creates a chart showing the percentage of each decade's total sales each genre generated."""
+    #Axes Level
+    g = sns.catplot(data=genres_with_decade_sales, kind = 'bar', x='decade', y='global_sales_percent',  hue='Genre', height=8, aspect=1.5)
+    g.ax.set_xlabel("")
+    g.ax.set_ylabel("Percentage of Each Decade's Total Video Game Sales", fontsize=14, labelpad=12)
+    g.ax.yaxis.set_major_formatter(mtick.PercentFormatter(1.0,0))
+    g.fig.suptitle("Genre Popularity within each Decade", fontsize=16)
+    return g.fig
+
+def market_share_by_year_plot(df,sup_ttl, hue_colors):
+    sns.set_context(rc={"lines.linewidth":6})
+    g = sns.relplot(data=df, kind='line', x='year', y='global_sales_percent', hue='Publisher', palette=hue_colors, height=8, aspect=1.5, legend='full')
+    g.set_axis_labels("", "Percentage of Each Year's Total Video Game Sales", fontsize=12,labelpad=10)
+    sns.move_legend(g, 'upper right', bbox_to_anchor=(0.5, 0.42, 0.5, 0.5), title="", fontsize=12, draggable=True)
+    g.ax.yaxis.set_major_formatter(mtick.PercentFormatter(1.0))
+    g.fig.suptitle(sup_ttl, fontsize=16)
+    plt.tight_layout()
+    return g.fig
+
+def publisher_sales_chart(top_pub_pivot):
+    """Creates a chart of publisher sales by year."""
+    bottom=np.zeros(37)
+    legend_labels =[]
+    fig, ax = plt.subplots(figsize=(12,8))
+    for n in range(1,7):
+       ax.bar(x=top_pub_pivot['year'], height=top_pub_pivot.iloc[:, n], bottom=bottom)
+       bottom += top_pub_pivot.iloc[:, n]
+       label=top_pub_pivot.columns[n]
+       legend_labels.append(label)
+    ax.legend(labels=legend_labels)
+    ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('${x:.0f}'))
+    ax.set_ylabel("Sales (in Millions)", fontsize=14, labelpad=12)
+    ax.spines[['top', 'right']].set_visible(False)
+    fig.suptitle("Annual Global Sales by the Six Top Selling Publishers", fontsize=16)
+    return fig
+
+def publisher_success_table(top_15, total_sales, publisher):
+    """Creates the table of the games making up the top 15% of a publisher's sales."""
+    if publisher=='Electronic Arts':
+        gt_tbl=(GT(top_15, rowname_col='Game Title').tab_header(title=f"Top 15% of {publisher.title()}' Video Game Sales", subtitle=f"Global Sales Between 1980 and 2016:  {custom_dollar_formatter(total_sales)}").tab_stubhead(label='Game Title').tab_style(
+            style=style.text(color='black'),
+            locations=[loc.body(), loc.column_labels(), loc.stubhead(), loc.header(), loc.stub()]))
+    else:
+        gt_tbl=(GT(top_15, rowname_col='Game Title').tab_header(title=f"Top 15% of {publisher.title()}'s Video Game Sales", subtitle=f"Global Sales Between 1980 and 2016:  {custom_dollar_formatter(total_sales)}").tab_stubhead(label='Game Title').tab_style(
+            style=style.text(color='black'),
+            locations=[loc.body(), loc.column_labels(), loc.stubhead(), loc.header(), loc.stub()]))
+    return gt_tbl
+
+def region_table(region_hits):
+    """Creates the table of regional best sellers."""
+    region_tbl = (GT(region_hits, rowname_col='Game Title').tab_header(title="Regional Best Sellers", subtitle="Games ranked in the top 5 bestselling by region, but not ranked in the top 25 bestselling globally").tab_style(
+                style=style.text(color='black'),
+                locations=[loc.body(), loc.column_labels(), loc.stubhead(), loc.header(), loc.stub()]))
+    return region_tbl
+
+def top_games_chart(top_sellers_world):
+    """Creates a chart of the top 25 games by global sales."""
+    fig, ax = plt.subplots(figsize=(12.5,10), constrained_layout=True)
+    ax.barh(y='Name', data=top_sellers_world, width='Global_Sales', color='#33a02c')
+    ax.set_title("Top 25 Games by Global Sales", fontsize=16, linespacing=1.5)
+    ax.set_xlabel("Global Sales in Millions of Dollars", fontsize=16, labelpad=12)
+    ax.spines[['top', 'right']].set_visible(False)
+    ax.xaxis.set_major_formatter(mtick.StrMethodFormatter('${x:.0f}M'))
+    plt.yticks(fontsize=10)
+    return fig
+
+def top_series_chart(top_team):
+    """Creates a chart of the top 20 game series by global sales."""
+    fig, ax = plt.subplots(figsize=(12,10), constrained_layout=True)
+    ax.barh(y='simple_name', data=top_team, width='Global_Sales', color='#6a3d9a')
+    ax.set_xlabel("Global Sales in Millions of Dollars", fontsize=16, labelpad=12)
+    ax.set_title("Top 20 Game Series by Global Sales", fontsize=16)
+    ax.spines[['top', 'right']].set_visible(False)
+    ax.xaxis.set_major_formatter(mtick.StrMethodFormatter('${x:.0f}M'))
+    plt.xticks(fontsize=8)
+    plt.yticks(fontsize=10)
+    return fig
+
+def back_of_envelope(games_final, title_index):
+    ## The following four sections of code are "back of the envelope" work I did to support my blog post's text.
+    # Publishers and titles are looked up in the title index (see title_index.py) rather than by scanning every record.
+    ea=games_final.iloc[lookup(title_index, 'Publisher', 'Electronic Arts')]
+    ea_grouped = ea.groupby(['Name'])['NA_Sales'].sum().reset_index()
+    ea_madden_07 = games_final.iloc[lookup(title_index, 'Name', 'Madden NFL 07', publisher='Electronic Arts')]
+    print(ea_madden_07.groupby(['Name'])['Global_Sales'].sum())
+    print(ea_grouped.sort_values(['NA_Sales'], ascending=False).head(20))
+
+    s_gt = games_final.iloc[lookup(title_index, 'Name', 'Gran Turismo 3: A-Spec', publisher='Sony Computer Entertainment')]
+    print(s_gt.groupby(['Name'])['NA_Sales'].sum())
+
+    ubi_r6 = games_final.iloc[search(title_index, 'Rainbow Six', publisher='Ubisoft')].groupby(['Name', 'year'])['Global_Sales'].sum().reset_index()
+    ubi_assassin = games_final.iloc[search(title_index, 'Assassin', prefix=True, publisher='Ubisoft')].groupby(['Name', 'year'])['Global_Sales'].sum().reset_index()
+    print(ubi_r6.sum())
+    print(ubi_r6)
+
+    act_cod = games_final.iloc[search(title_index, 'Call of Duty', publisher='Activision')].groupby(['Name'])['Global_Sales'].sum().reset_index()
+    print(act_cod.sum())
+    print(ubi_assassin)
+
+def report_artifacts(results):
+    """Returns the charts and tables for the blog post as (name, builder, args) artifacts, in the order they appear."""
+    ###Early Leaders Publishing
+    highest_sales_publishers_list=results['highest_sales_publisher']['Publisher'].values.tolist()
+    early_publishers_list=results['early_publishers'].values.tolist()
+    # Sorted so every publisher gets the same color on every run; a set's order changes from run to run.
+    interesting_publishers=enumerate(sorted(set(early_publishers_list+highest_sales_publishers_list)))
+    hue_colors=color_map_to_category(interesting_publishers)
+
+    artifacts = [
+        ('genre_by_decade_chart', genre_by_decade_chart, (results['genres_with_decade_sales'],)),
+        ('top_publishers_market_share', market_share_by_year_plot, (results['top_publishers'], "The Six Top Selling Publishers' Market Share by Year", hue_colors)),
+        ('early_publishers_market_share', market_share_by_year_plot, (results['early_publishers_with_year_sales'], "Publishers Dominating the Eighties", hue_colors)),
+        ('publisher_sales_chart', publisher_sales_chart, (results['top_pub_pivot'],)),
+    ]
+    for publisher, (top_15, total_sales) in results['publisher_success'].items():
+        artifacts.append((publisher.lower().replace(' ', '_').replace('-', '_') + '_tbl', publisher_success_table, (top_15, total_sales, publisher)))
+    artifacts += [
+        ('region_tbl', region_table, (results['region_hits'],)),
+        ('top_games_chart', top_games_chart, (results['top_sellers_world'],)),
+        ('top_series_chart', top_series_chart, (results['top_team'],)),
+    ]
+    return artifacts
+
+def show_report(results):
+    """Shows the charts and tables for the blog post from the aggregation results."""
+    artifacts = report_artifacts(results)
+    # The back of the envelope numbers are printed between the publisher tables and the regional best sellers, as in the blog post's order.
+    show_artifacts(artifacts[:-3])
+    back_of_envelope(results['games_final'], results['title_index'])
+    show_artifacts(artifacts[-3:])
+    region_table(results['region_hits']).save('region_tbl.pdf')
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# Maps release years to ordered categorical buckets (decades, lustrums, console generations or any edges) in one vectorized pass, instead of a dict of every year applied with Series.replace.
+# The result is a pandas Categorical, so groupbys and seaborn keep the buckets in time order.  Null years, and years outside the edges, get a null bucket rather than being left as they were.
+# Fixed width schemes: the width in years and the label of a bucket from its first year.
+WIDTHS = {
+    'decade': (10, lambda start: f'{start}s'),
+    'lustrum': (5, lambda start: f'{start}-{start + 4}'),
+}
+# First year of each console generation, as usually dated by the release of its first home console.
+CONSOLE_GENERATIONS = [
+    (1976, '2nd generation'),
+    (1983, '3rd generation'),
+    (1987, '4th generation'),
+    (1993, '5th generation'),
+    (1998, '6th generation'),
+    (2005, '7th generation'),
+    (2012, '8th generation'),
+    (2020, '9th generation'),
+]
+
+
+def year_values(years):
+    """Returns the years as an int64 array, with 0 in place of nulls, and the mask of null years."""
+    years = pd.Series(years)
+    missing = years.isna().to_numpy()
+    # Only copy to fill nulls when there are any; the year partition column is usually a complete Int16.
+    if missing.any():
+        years = years.fillna(0)
+    return years.to_numpy(dtype='int64'), missing
+
+
+def fixed_width_buckets(years, width, label, start=None, stop=None):
+    """Returns the bucket of every year for buckets width years wide, aligned to multiples of width.  The buckets run from start to stop, by default the first and last year present."""
+    values, missing = year_values(years)
+    present = values[~missing]
+    if start is None and stop is None and not len(present):
+        return pd.Categorical.from_codes(np.full(len(values), -1), categories=[], ordered=True)
+    if start is None:
+        start = present.min() if len(present) else 0
+    if stop is None:
+        stop = present.max() if len(present) else start
+    first = start // width * width
+    n_buckets = stop // width - start // width + 1
+    codes = (values - first) // width
+    codes[missing | (codes < 0) | (codes >= n_buckets)] = -1
+    labels = [label(first + i * width) for i in range(n_buckets)]
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def edge_buckets(years, edges, labels=None):
+    """Returns the bucket of every year for buckets starting at each of edges (sorted).  The last bucket is open ended; years before the first edge get a null bucket."""
+    values, missing = year_values(years)
+    edges = np.asarray(edges)
+    labels = labels if labels is not None else [str(edge) for edge in edges]
+    codes = np.searchsorted(edges, values, side='right') - 1
+    codes[missing] = -1
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def bucket_years(years, scheme='decade', edges=None, labels=None):
+    """Returns an ordered Categorical with the bucket of every year.
+
+    scheme is 'decade', 'lustrum' or 'generation' (see CONSOLE_GENERATIONS).  For any other bucketing pass edges, the first year of each bucket, and optionally their labels.
+    """
+    if edges is not None:
+        return edge_buckets(years, edges, labels)
+    if scheme == 'generation':
+        return edge_buckets(years, [start for start, _ in CONSOLE_GENERATIONS], [name for _, name in CONSOLE_GENERATIONS])
+    if scheme not in WIDTHS:
+        raise ValueError(f"Unknown scheme {scheme!r}; use one of {sorted(WIDTHS) + ['generation']} or pass edges")
+    width, label = WIDTHS[scheme]
+    return fixed_width_buckets(years, width, label)